@@ -0,0 +1,212 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+
+from .utils import database_lock, write_file_atomic
+
+# Размер блока, на которые делятся файлы в резервной копии
+CHUNK_SIZE = 1024 * 1024
+
+# Имя метаданных в снимке
+METADATA_NAME = 'db_meta.json'
+
+
+def _objects_dir(backup_dir):
+    return os.path.join(backup_dir, 'objects')
+
+
+def _manifests_dir(backup_dir):
+    return os.path.join(backup_dir, 'manifests')
+
+
+def _file_stat(filepath):
+    """
+    Возвращает отпечаток файла: inode, размер и время изменения.
+    Файлы базы заменяются атомарно, поэтому любое изменение
+    дает новый отпечаток.
+    """
+    stat = os.stat(filepath)
+    return [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+
+
+def _iter_chunks(filepath):
+    with open(filepath, 'rb') as file:
+        yield from iter(lambda: file.read(CHUNK_SIZE), b'')
+
+
+def _file_chunks(filepath):
+    """
+    Возвращает список хэшей блоков файла.
+    """
+    return [hashlib.sha256(chunk).hexdigest() for chunk in _iter_chunks(filepath)]
+
+
+def _store_file(filepath, backup_dir):
+    """
+    Копирует в хранилище блоки файла, которых там еще нет.
+    Возвращает (хэши блоков, число скопированных байт).
+    """
+    objects_dir = _objects_dir(backup_dir)
+    chunks = []
+    copied = 0
+    for chunk in _iter_chunks(filepath):
+        digest = hashlib.sha256(chunk).hexdigest()
+        object_path = os.path.join(objects_dir, digest)
+        if not os.path.exists(object_path):
+            write_file_atomic(object_path, chunk)
+            copied += len(chunk)
+        chunks.append(digest)
+    return chunks, copied
+
+
+def _read_object(backup_dir, digest):
+    """
+    Читает блок из хранилища и проверяет его хэш.
+    """
+    with open(os.path.join(_objects_dir(backup_dir), digest), 'rb') as file:
+        chunk = file.read()
+    if hashlib.sha256(chunk).hexdigest() != digest:
+        raise ValueError(f"Резервная копия повреждена: блок {digest}")
+    return chunk
+
+
+def list_backups(backup_dir):
+    """
+    Возвращает идентификаторы резервных копий от старых к новым.
+    """
+    try:
+        names = os.listdir(_manifests_dir(backup_dir))
+    except FileNotFoundError:
+        return []
+    return sorted(name[:-5] for name in names if name.endswith('.json'))
+
+
+def load_manifest(backup_dir, backup_id=None):
+    """
+    Загружает описание резервной копии (по умолчанию последней).
+    """
+    if backup_id is None:
+        backups = list_backups(backup_dir)
+        if not backups:
+            raise FileNotFoundError(f"В {backup_dir} нет резервных копий")
+        backup_id = backups[-1]
+    filepath = os.path.join(_manifests_dir(backup_dir), f"{backup_id}.json")
+    with open(filepath, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def _take_snapshot(snapshot_dir, data_dir, meta_path):
+    """
+    Делает снимок метаданных и файлов таблиц жесткими ссылками.
+    Блокировка держится только на время создания ссылок, а не копирования:
+    писатели заменяют файлы новыми, не трогая связанные со снимком.
+    """
+    with database_lock(data_dir):
+        with open(meta_path, 'rb') as file:
+            metadata_raw = file.read()
+        write_file_atomic(os.path.join(snapshot_dir, METADATA_NAME), metadata_raw)
+
+        tables = []
+        for table_name in json.loads(metadata_raw.decode('utf-8')):
+            source = os.path.join(data_dir, f"{table_name}.json")
+            target = os.path.join(snapshot_dir, f"{table_name}.json")
+            try:
+                os.link(source, target)
+            except FileNotFoundError:
+                continue
+            except OSError:
+                # Файловая система без жестких ссылок — копируем под блокировкой
+                shutil.copy2(source, target)
+            tables.append(table_name)
+    return tables
+
+
+def create_backup(backup_dir, data_dir="data", meta_path="db_meta.json"):
+    """
+    Создает согласованную резервную копию всех таблиц и метаданных.
+    Копируются только блоки, которых нет в предыдущих копиях,
+    а файлы с неизменным отпечатком даже не перечитываются.
+    Возвращает описание созданной копии.
+    """
+    os.makedirs(_objects_dir(backup_dir), exist_ok=True)
+    os.makedirs(_manifests_dir(backup_dir), exist_ok=True)
+
+    previous = {}
+    if list_backups(backup_dir):
+        previous = load_manifest(backup_dir)['tables']
+
+    manifest = {
+        'id': datetime.now().strftime('%Y%m%dT%H%M%S%f'),
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'tables': {},
+        'total_bytes': 0,
+        'copied_bytes': 0,
+    }
+
+    snapshot_dir = tempfile.mkdtemp(prefix='.snapshot-', dir=data_dir)
+    try:
+        tables = _take_snapshot(snapshot_dir, data_dir, meta_path)
+
+        metadata_path = os.path.join(snapshot_dir, METADATA_NAME)
+        metadata_chunks, copied = _store_file(metadata_path, backup_dir)
+        manifest['metadata'] = metadata_chunks
+        manifest['total_bytes'] += os.path.getsize(metadata_path)
+        manifest['copied_bytes'] += copied
+
+        for table_name in tables:
+            filepath = os.path.join(snapshot_dir, f"{table_name}.json")
+            stat = _file_stat(filepath)
+            entry = previous.get(table_name)
+            if entry and entry['stat'] == stat:
+                chunks = entry['chunks']
+            else:
+                chunks, copied = _store_file(filepath, backup_dir)
+                manifest['copied_bytes'] += copied
+            manifest['tables'][table_name] = {'chunks': chunks, 'stat': stat}
+            manifest['total_bytes'] += stat[1]
+    finally:
+        shutil.rmtree(snapshot_dir, ignore_errors=True)
+
+    text = json.dumps(manifest, ensure_ascii=False, indent=2)
+    write_file_atomic(
+        os.path.join(_manifests_dir(backup_dir), f"{manifest['id']}.json"),
+        text.encode('utf-8'),
+    )
+    return manifest
+
+
+def restore_backup(backup_dir, backup_id=None, data_dir="data",
+                   meta_path="db_meta.json"):
+    """
+    Восстанавливает базу из резервной копии (по умолчанию последней).
+    Перезаписываются только файлы, содержимое которых отличается от копии.
+    Возвращает (описание копии, восстановленные таблицы, число неизменных).
+    """
+    manifest = load_manifest(backup_dir, backup_id)
+
+    restored = []
+    unchanged = 0
+    with database_lock(data_dir):
+        for table_name, entry in manifest['tables'].items():
+            filepath = os.path.join(data_dir, f"{table_name}.json")
+            if os.path.exists(filepath) and _file_chunks(filepath) == entry['chunks']:
+                unchanged += 1
+                continue
+            raw = b''.join(
+                _read_object(backup_dir, digest) for digest in entry['chunks']
+            )
+            write_file_atomic(filepath, raw)
+            restored.append(table_name)
+
+        if not os.path.exists(meta_path) or (
+            _file_chunks(meta_path) != manifest['metadata']
+        ):
+            raw = b''.join(
+                _read_object(backup_dir, digest) for digest in manifest['metadata']
+            )
+            write_file_atomic(meta_path, raw)
+
+    return manifest, restored, unchanged
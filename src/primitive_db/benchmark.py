@@ -0,0 +1,159 @@
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from prettytable import PrettyTable
+
+from .query import compile_where
+from .schema import get_validator
+from .utils import load_encoded_table_data, load_table_data, save_table_data
+
+# Схема тестовой таблицы
+COLUMNS = ['ID:int', 'name:str', 'status:str', 'age:int', 'is_active:bool']
+
+NAMES = ['Алексей', 'Иван', 'Мария', 'Ольга', 'Петр', 'Анна', 'Сергей']
+STATUSES = ['new', 'active', 'blocked', 'archived']
+
+# Конфигурации хранения: название -> дополнительные ключи метаданных
+CONFIGS = {
+    'json': {'codec': 'json'},
+    'rows': {'codec': 'rows'},
+    'binary': {'codec': 'binary'},
+    'rows + dictionary': {'codec': 'rows', 'dictionary': True},
+    'rows + zlib': {'codec': 'rows', 'compression': 'zlib'},
+    'rows + dictionary + zlib': {
+        'codec': 'rows', 'dictionary': True, 'compression': 'zlib'
+    },
+    'binary + dictionary + lzma': {
+        'codec': 'binary', 'dictionary': True, 'compression': 'lzma'
+    },
+}
+
+
+def generate_records(count, seed=42):
+    """
+    Генерирует тестовые записи с повторяющимися строковыми значениями.
+    """
+    rng = random.Random(seed)
+    return [
+        {
+            'ID': i,
+            'name': rng.choice(NAMES),
+            'status': rng.choice(STATUSES),
+            'age': rng.randint(18, 80),
+            'is_active': rng.random() < 0.5,
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def _measure(func):
+    """
+    Возвращает результат функции и затраченное процессорное время.
+    """
+    start_time = time.process_time()
+    result = func()
+    return result, time.process_time() - start_time
+
+
+def run_benchmark(count=100_000):
+    """
+    Сравнивает размер файла, время записи, чтения и сканирования
+    для разных конфигураций хранения.
+    """
+    records = generate_records(count)
+    where_clause = {'status': 'blocked'}
+
+    table = PrettyTable()
+    table.field_names = [
+        'Конфигурация', 'Размер, КБ', 'Запись, с', 'Чтение, с', 'Скан, с'
+    ]
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        for name, options in CONFIGS.items():
+            table_meta = {'columns': COLUMNS, **options}
+
+            _, save_time = _measure(
+                lambda: save_table_data('bench', records, data_dir, table_meta)
+            )
+            size = os.path.getsize(os.path.join(data_dir, 'bench.json'))
+            _, load_time = _measure(lambda: load_table_data('bench', data_dir))
+
+            def scan():
+                data, dictionaries = load_encoded_table_data('bench', data_dir)
+                matches = compile_where(where_clause, dictionaries)
+                return sum(1 for record in data if matches(record))
+
+            _, scan_time = _measure(scan)
+
+            table.add_row([
+                name,
+                f"{size / 1024:.1f}",
+                f"{save_time:.3f}",
+                f"{load_time:.3f}",
+                f"{scan_time:.3f}",
+            ])
+
+    print(f"Записей: {count}")
+    print(table)
+
+
+def _validate_legacy(columns, values):
+    """
+    Проверка типов цепочкой if/elif, как до появления валидаторов схемы.
+    """
+    for column_def, value in zip(columns[1:], values):
+        col_type = column_def.split(':')[1]
+        if col_type == 'int' and not isinstance(value, int):
+            return False
+        elif col_type == 'str' and not isinstance(value, str):
+            return False
+        elif col_type == 'bool' and not isinstance(value, bool):
+            return False
+    return True
+
+
+def run_row_benchmark(count=100_000):
+    """
+    Сравнивает память и время загрузки записей в виде словарей
+    и в виде классов строк, а также скорость проверки типов.
+    """
+    records = generate_records(count)
+    table_meta = {'columns': COLUMNS, 'codec': 'rows'}
+
+    table = PrettyTable()
+    table.field_names = ['Представление', 'Память, МБ', 'Загрузка, с']
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        save_table_data('bench', records, data_dir, table_meta)
+        for name, meta in [('dict', None), ('__slots__', table_meta)]:
+            tracemalloc.start()
+            data, load_time = _measure(
+                lambda: load_table_data('bench', data_dir, meta)
+            )
+            memory, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del data
+            table.add_row([name, f"{memory / 2**20:.1f}", f"{load_time:.3f}"])
+
+    rows = [list(record.values())[1:] for record in records]
+    validate = get_validator(table_meta)
+    _, legacy_time = _measure(
+        lambda: [_validate_legacy(COLUMNS, values) for values in rows]
+    )
+    _, compiled_time = _measure(lambda: [validate(values) for values in rows])
+
+    print(table)
+    print(
+        f"Проверка типов: if/elif {legacy_time:.3f} с, "
+        f"скомпилированный валидатор {compiled_time:.3f} с"
+    )
+
+
+if __name__ == "__main__":
+    record_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    run_benchmark(record_count)
+    run_row_benchmark(record_count)
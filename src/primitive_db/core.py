@@ -1,7 +1,36 @@
+from itertools import islice
+
 from prettytable import PrettyTable
 
+from .backup import create_backup, restore_backup
 from .decorators import confirm_action, create_cacher, handle_db_errors, log_time
-from .utils import load_table_data, save_table_data
+from .indexes import (
+    INDEX_TYPES,
+    build_prefix_index,
+    load_index,
+    lookup_prefix,
+    save_index,
+    update_index,
+)
+from .query import LIKE_OPERATORS, compile_where, prefix_of
+from .results import external_sort, stream_table, top_n
+from .schema import (
+    RESERVED_NAMES,
+    get_row_class,
+    get_set_validator,
+    get_validator,
+    is_valid_column_name,
+)
+from .utils import (
+    DEFAULT_CODEC,
+    database_lock,
+    decode_dictionaries,
+    load_encoded_table_data,
+    load_metadata,
+    load_table_data,
+    save_table_data,
+)
+from .views import COUNT_COLUMN, apply_view_changes, build_view, view_columns
 
 # Создаем кэшер для результатов запросов
 cache_result = create_cacher()
@@ -22,6 +51,13 @@ def validate_column_definition(column_def):
     if not name.strip():
         return False, "Имя столбца не может быть пустым"
     
+    if not is_valid_column_name(name.strip()):
+        return False, (
+            f"Некорректное имя столбца: {name}. Имя должно быть "
+            f"идентификатором Python, не начинаться с '_' и не совпадать "
+            f"с {', '.join(sorted(RESERVED_NAMES))}"
+        )
+    
     if col_type not in SUPPORTED_TYPES:
         error_msg = (
             f"Неподдерживаемый тип данных: {col_type}. "
@@ -32,6 +68,51 @@ def validate_column_definition(column_def):
     return True, (name.strip(), col_type)
 
 
+def get_dependent_views(metadata, table_name):
+    """
+    Возвращает имена представлений, построенных по таблице.
+    """
+    return [
+        name for name, meta in metadata.items()
+        if meta.get('view', {}).get('source') == table_name
+    ]
+
+
+def propagate_changes(metadata, table_name, changes):
+    """
+    Применяет изменения таблицы к ее индексам и зависимым представлениям
+    и сбрасывает кэш запросов.
+    changes — список пар (старая запись, новая запись).
+    """
+    for column in metadata[table_name].get('indexes', {}):
+        update_index(table_name, column, changes)
+    
+    for view_name in get_dependent_views(metadata, table_name):
+        view_meta = metadata[view_name]
+        view_data = load_table_data(view_name, table_meta=view_meta)
+        view_data = apply_view_changes(view_meta['view'], view_data, changes)
+        save_table_data(view_name, view_data, table_meta=view_meta)
+    
+    cache_result.clear()
+
+
+def find_by_index(table_name, table_meta, where_clause):
+    """
+    Возвращает ID записей-кандидатов для условия WHERE по префиксному
+    индексу или None, если ни одно условие не может использовать индекс.
+    Кандидаты нужно дополнительно проверить полным условием.
+    """
+    indexes = table_meta.get('indexes', {})
+    for column, value in where_clause.items():
+        if column not in indexes or not isinstance(value, dict):
+            continue
+        (operator, pattern), = value.items()
+        prefix = prefix_of(pattern)
+        if operator in LIKE_OPERATORS and prefix is not None:
+            return lookup_prefix(load_index(table_name, column), prefix)
+    return None
+
+
 @handle_db_errors
 def create_table(metadata, table_name, columns):
     """
@@ -48,6 +129,7 @@ def create_table(metadata, table_name, columns):
     
     # Автоматически добавляем столбец ID
     table_columns = ['ID:int']
+    column_names = {'ID'}
     
     # Обрабатываем пользовательские столбцы
     for column_def in columns:
@@ -55,15 +137,19 @@ def create_table(metadata, table_name, columns):
         if not is_valid:
             return False, result
         column_name, column_type = result
+        if column_name in column_names:
+            return False, f'Столбец "{column_name}" указан более одного раза.'
+        column_names.add(column_name)
         table_columns.append(f"{column_name}:{column_type}")
     
     # Добавляем таблицу в метаданные
     metadata[table_name] = {
-        'columns': table_columns
+        'columns': table_columns,
+        'codec': DEFAULT_CODEC,
     }
     
     # Создаем пустой файл данных для таблицы
-    save_table_data(table_name, [])
+    save_table_data(table_name, [], table_meta=metadata[table_name])
     
     success_msg = (
         f'Таблица "{table_name}" успешно создана '
@@ -81,7 +167,15 @@ def drop_table(metadata, table_name):
     if table_name not in metadata:
         return False, f'Таблица "{table_name}" не существует.'
     
+    views = get_dependent_views(metadata, table_name)
+    if views:
+        return False, (
+            f'Таблицу "{table_name}" используют представления: '
+            f'{", ".join(views)}. Сначала удалите их.'
+        )
+    
     del metadata[table_name]
+    cache_result.clear()
     return True, f'Таблица "{table_name}" успешно удалена.'
 
 
@@ -93,7 +187,10 @@ def list_tables(metadata):
     if not metadata:
         return "Нет созданных таблиц."
     
-    tables = list(metadata.keys())
+    tables = [
+        f"{name} (представление)" if 'view' in meta else name
+        for name, meta in metadata.items()
+    ]
     if len(tables) == 1:
         return f"- {tables[0]}"
     else:
@@ -104,31 +201,10 @@ def list_tables(metadata):
 def validate_data_types(metadata, table_name, values):
     """
     Проверяет соответствие типов данных значениям.
+    Использует скомпилированный для схемы таблицы валидатор.
     """
-    table_meta = metadata[table_name]
-    columns = table_meta['columns']
-    
-    # Пропускаем ID столбец (он первый)
-    data_columns = columns[1:]
-    
-    if len(values) != len(data_columns):
-        return False, (
-            f"Неверное количество значений. Ожидается {len(data_columns)}, "
-            f"получено {len(values)}"
-        )
-    
-    for i, (column_def, value) in enumerate(zip(data_columns, values)):
-        col_name, col_type = column_def.split(':')
-        
-        # Проверяем тип
-        if col_type == 'int' and not isinstance(value, int):
-            return False, f"Столбец '{col_name}' должен быть типа int"
-        elif col_type == 'str' and not isinstance(value, str):
-            return False, f"Столбец '{col_name}' должен быть типа str"
-        elif col_type == 'bool' and not isinstance(value, bool):
-            return False, f"Столбец '{col_name}' должен быть типа bool"
-    
-    return True, "OK"
+    validate = get_validator(metadata[table_name])
+    return validate(values)
 
 
 @handle_db_errors
@@ -140,8 +216,12 @@ def insert(metadata, table_name, values):
     if table_name not in metadata:
         return False, f'Таблица "{table_name}" не существует.'
     
+    if 'view' in metadata[table_name]:
+        return False, f'"{table_name}" — представление, изменять его нельзя.'
+    
     # Загружаем данные таблицы
-    table_data = load_table_data(table_name)
+    table_meta = metadata[table_name]
+    table_data = load_table_data(table_name, table_meta=table_meta)
     
     # Валидируем типы данных
     is_valid, message = validate_data_types(metadata, table_name, values)
@@ -155,18 +235,24 @@ def insert(metadata, table_name, values):
         new_id = 1
     
     # Создаем запись
-    record = {'ID': new_id}
-    columns = metadata[table_name]['columns'][1:]  # Пропускаем ID
-    
-    for i, column_def in enumerate(columns):
-        col_name = column_def.split(':')[0]
-        record[col_name] = values[i]
+    row_class = get_row_class(table_name, table_meta)
+    if row_class is not None:
+        record = row_class(new_id, *values)
+    else:
+        record = {'ID': new_id}
+        columns = table_meta['columns'][1:]  # Пропускаем ID
+        
+        for i, column_def in enumerate(columns):
+            col_name = column_def.split(':')[0]
+            record[col_name] = values[i]
     
     # Добавляем запись
     table_data.append(record)
     
-    # Сохраняем данные
-    save_table_data(table_name, table_data)
+    # Сохраняем данные и обновляем представления
+    with database_lock():
+        save_table_data(table_name, table_data, table_meta=metadata[table_name])
+        propagate_changes(metadata, table_name, [(None, record)])
     
     return True, (
         f'Запись с ID={new_id} успешно добавлена в таблицу "{table_name}".'
@@ -175,39 +261,54 @@ def insert(metadata, table_name, values):
 
 @handle_db_errors
 @log_time
-def select(metadata, table_name, where_clause=None):
+def select(metadata, table_name, where_clause=None, order_by=None,
+           descending=False, limit=None):
     """
     Выбирает записи из таблицы.
+    С order_by или limit результат сортируется с ограниченной памятью
+    и возвращается как итератор строк вывода.
     """
     if table_name not in metadata:
         return False, f'Таблица "{table_name}" не существует.'
     
+    if order_by is not None or limit is not None:
+        return select_ordered(
+            metadata, table_name, where_clause, order_by, descending, limit
+        )
+    
     # Создаем ключ для кэша
     cache_key = f"select_{table_name}_{str(where_clause)}"
     
     def _select_data():
-        # Загружаем данные таблицы
-        table_data = load_table_data(table_name)
+        # По индексу загружаются только записи-кандидаты
+        indexed_ids = None
+        if where_clause:
+            indexed_ids = find_by_index(
+                table_name, metadata[table_name], where_clause
+            )
+        
+        # Загружаем данные таблицы (словарные столбцы остаются кодами)
+        table_data, dictionaries = load_encoded_table_data(
+            table_name, table_meta=metadata[table_name], ids=indexed_ids
+        )
         
         if not table_data:
+            if indexed_ids is not None:
+                return True, "Записей, удовлетворяющих условию, не найдено."
             return True, "Таблица пуста."
         
         # Фильтруем данные если есть условие
         if where_clause:
-            filtered_data = []
-            for record in table_data:
-                match = True
-                for column, value in where_clause.items():
-                    if record.get(column) != value:
-                        match = False
-                        break
-                if match:
-                    filtered_data.append(record)
+            matches = compile_where(where_clause, dictionaries)
+            filtered_data = [record for record in table_data if matches(record)]
             
             if not filtered_data:
                 return True, "Записей, удовлетворяющих условию, не найдено."
             table_data = filtered_data
         
+        # Раскрываем коды словарей только у выбранных записей
+        decode_dictionaries(table_data, dictionaries)
+        
         # Создаем красивую таблицу для вывода
         columns = [col.split(':')[0] for col in metadata[table_name]['columns']]
         table = PrettyTable()
@@ -223,6 +324,65 @@ def select(metadata, table_name, where_clause=None):
     return cache_result(cache_key, _select_data)
 
 
+def select_ordered(metadata, table_name, where_clause, order_by, descending,
+                   limit):
+    """
+    Выбирает записи с сортировкой и/или ограничением количества.
+    Сортировка внешняя: отрезки сверх буфера сбрасываются во временные
+    файлы и сливаются через heapq.merge; для limit используется куча.
+    Вывод формируется построчно и не кэшируется.
+    """
+    table_meta = metadata[table_name]
+    columns = [col.split(':')[0] for col in table_meta['columns']]
+    
+    if order_by is not None and order_by not in columns:
+        return False, (
+            f'Столбец "{order_by}" не существует в таблице "{table_name}".'
+        )
+    if limit is not None and limit < 0:
+        return False, "Значение limit не может быть отрицательным."
+    
+    # По индексу загружаются только записи-кандидаты
+    indexed_ids = None
+    if where_clause:
+        indexed_ids = find_by_index(table_name, table_meta, where_clause)
+    
+    # Загружаем данные таблицы (словарные столбцы остаются кодами)
+    table_data, dictionaries = load_encoded_table_data(
+        table_name, table_meta=table_meta, ids=indexed_ids
+    )
+    
+    if not table_data:
+        if indexed_ids is not None:
+            return True, "Записей, удовлетворяющих условию, не найдено."
+        return True, "Таблица пуста."
+    
+    matches = compile_where(where_clause, dictionaries)
+    
+    # Строки вывода создаются по одной, коды словарей раскрываются на лету
+    decoders = [dictionaries.get(col) for col in columns]
+    rows = (
+        tuple(
+            values[record.get(col)] if values is not None else record.get(col)
+            for col, values in zip(columns, decoders)
+        )
+        for record in table_data
+        if matches(record)
+    )
+    
+    if order_by is None:
+        result_rows = list(islice(rows, limit))
+    elif limit is not None:
+        result_rows = top_n(rows, columns.index(order_by), limit, descending)
+    else:
+        result_rows = external_sort(rows, columns.index(order_by), descending)
+    
+    if not len(result_rows):
+        return True, "Записей, удовлетворяющих условию, не найдено."
+    
+    return True, stream_table(columns, result_rows)
+
+
 @handle_db_errors
 def update(metadata, table_name, set_clause, where_clause):
     """
@@ -231,8 +391,13 @@ def update(metadata, table_name, set_clause, where_clause):
     if table_name not in metadata:
         return False, f'Таблица "{table_name}" не существует.'
     
-    # Загружаем данные таблицы
-    table_data = load_table_data(table_name)
+    if 'view' in metadata[table_name]:
+        return False, f'"{table_name}" — представление, изменять его нельзя.'
+    
+    # Загружаем данные таблицы (словарные столбцы остаются кодами)
+    table_data, dictionaries = load_encoded_table_data(
+        table_name, table_meta=metadata[table_name]
+    )
     
     if not table_data:
         return False, "Таблица пуста."
@@ -245,26 +410,31 @@ def update(metadata, table_name, set_clause, where_clause):
                 f'Столбец "{column}" не существует в таблице "{table_name}".'
             )
     
-    # Находим и обновляем записи
-    updated_count = 0
-    for record in table_data:
-        match = True
-        if where_clause:
-            for column, value in where_clause.items():
-                if record.get(column) != value:
-                    match = False
-                    break
-        
-        if match:
-            updated_count += 1
-            for column, new_value in set_clause.items():
-                record[column] = new_value
+    # Проверяем типы новых значений
+    is_valid, error_msg = get_set_validator(metadata[table_name])(set_clause)
+    if not is_valid:
+        return False, error_msg
+    
+    # Находим записи по кодам, затем раскрываем словари и обновляем
+    matches = compile_where(where_clause, dictionaries)
+    matched = [record for record in table_data if matches(record)]
+    updated_count = len(matched)
     
     if updated_count == 0:
         return False, "Записей, удовлетворяющих условию, не найдено."
     
-    # Сохраняем данные
-    save_table_data(table_name, table_data)
+    decode_dictionaries(table_data, dictionaries)
+    changes = []
+    for record in matched:
+        old_record = dict(record)
+        for column, new_value in set_clause.items():
+            record[column] = new_value
+        changes.append((old_record, record))
+    
+    # Сохраняем данные и обновляем представления
+    with database_lock():
+        save_table_data(table_name, table_data, table_meta=metadata[table_name])
+        propagate_changes(metadata, table_name, changes)
     
     return True, (
         f'{updated_count} запись(ей) успешно обновлено в таблице "{table_name}".'
@@ -280,40 +450,50 @@ def delete(metadata, table_name, where_clause):
     if table_name not in metadata:
         return False, f'Таблица "{table_name}" не существует.'
     
-    # Загружаем данные таблицы
-    table_data = load_table_data(table_name)
+    if 'view' in metadata[table_name]:
+        return False, f'"{table_name}" — представление, изменять его нельзя.'
+    
+    # Загружаем данные таблицы (словарные столбцы остаются кодами)
+    table_data, dictionaries = load_encoded_table_data(
+        table_name, table_meta=metadata[table_name]
+    )
     
     if not table_data:
         return False, "Таблица пуста."
     
     # Фильтруем записи для удаления
     if where_clause:
+        matches = compile_where(where_clause, dictionaries)
         filtered_data = []
-        deleted_count = 0
-        
+        deleted_data = []
         for record in table_data:
-            match = True
-            for column, value in where_clause.items():
-                if record.get(column) != value:
-                    match = False
-                    break
-            
-            if not match:
-                filtered_data.append(record)
+            if matches(record):
+                deleted_data.append(record)
             else:
-                deleted_count += 1
+                filtered_data.append(record)
+        deleted_count = len(deleted_data)
         
         if deleted_count == 0:
             return False, "Записей, удовлетворяющих условию, не найдено."
         
-        table_data = filtered_data
+        table_data = decode_dictionaries(filtered_data, dictionaries)
     else:
         # Если нет условия, удаляем все
+        deleted_data = table_data
         deleted_count = len(table_data)
         table_data = []
     
-    # Сохраняем данные
-    save_table_data(table_name, table_data)
+    # Удаленные записи нужны индексам и представлениям в раскрытом виде
+    changes = []
+    if (get_dependent_views(metadata, table_name)
+            or metadata[table_name].get('indexes')):
+        decode_dictionaries(deleted_data, dictionaries)
+        changes = [(record, None) for record in deleted_data]
+    
+    # Сохраняем данные и обновляем представления
+    with database_lock():
+        save_table_data(table_name, table_data, table_meta=metadata[table_name])
+        propagate_changes(metadata, table_name, changes)
     
     return True, (
         f'{deleted_count} запись(ей) успешно удалено из таблице "{table_name}".'
@@ -329,7 +509,9 @@ def info_table(metadata, table_name):
         return False, f'Таблица "{table_name}" не существует.'
     
     # Загружаем данные таблицы для подсчета записей
-    table_data = load_table_data(table_name)
+    table_data, _ = load_encoded_table_data(
+        table_name, table_meta=metadata[table_name]
+    )
     record_count = len(table_data)
     
     table_meta = metadata[table_name]
@@ -341,4 +523,160 @@ def info_table(metadata, table_name):
         f"Количество записей: {record_count}"
     )
     
-    return True, info_msg
\ No newline at end of file
+    return True, info_msg
+
+
+@handle_db_errors
+def create_view(metadata, view_name, source, where_clause=None, group_by=None):
+    """
+    Создает материализованное представление по таблице.
+    Результат запроса сохраняется как таблица и в дальнейшем
+    обновляется изменениями insert, update и delete.
+    """
+    if view_name in metadata:
+        return False, f'Таблица "{view_name}" уже существует.'
+    
+    if source not in metadata:
+        return False, f'Таблица "{source}" не существует.'
+    
+    source_meta = metadata[source]
+    if 'view' in source_meta:
+        return False, "Представление можно построить только по таблице."
+    
+    # Проверяем, что столбцы запроса существуют
+    source_columns = [col.split(':')[0] for col in source_meta['columns']]
+    used_columns = list(where_clause or {}) + ([group_by] if group_by else [])
+    for column in used_columns:
+        if column not in source_columns:
+            return False, (
+                f'Столбец "{column}" не существует в таблице "{source}".'
+            )
+    
+    if group_by == COUNT_COLUMN:
+        return False, f'Группировка по столбцу "{COUNT_COLUMN}" не поддерживается.'
+    
+    view_def = {'source': source, 'where': where_clause, 'group_by': group_by}
+    metadata[view_name] = {
+        'columns': view_columns(source_meta, group_by),
+        'codec': DEFAULT_CODEC,
+        'view': view_def,
+    }
+    
+    # Исходная таблица читается под той же блокировкой, что и пишется
+    # представление, чтобы снимок резервной копии видел их согласованными
+    with database_lock():
+        source_data = load_table_data(source, table_meta=source_meta)
+        view_data = build_view(view_def, source_data)
+        save_table_data(view_name, view_data, table_meta=metadata[view_name])
+    
+    return True, (
+        f'Представление "{view_name}" успешно создано, '
+        f'записей: {len(view_data)}.'
+    )
+
+
+@handle_db_errors
+@log_time
+def refresh_view(metadata, view_name):
+    """
+    Полностью пересчитывает представление по исходной таблице.
+    """
+    if view_name not in metadata or 'view' not in metadata[view_name]:
+        return False, f'Представление "{view_name}" не существует.'
+    
+    view_meta = metadata[view_name]
+    view_def = view_meta['view']
+    with database_lock():
+        source_data = load_table_data(
+            view_def['source'], table_meta=metadata[view_def['source']]
+        )
+        view_data = build_view(view_def, source_data)
+        save_table_data(view_name, view_data, table_meta=view_meta)
+    cache_result.clear()
+    
+    return True, (
+        f'Представление "{view_name}" обновлено, записей: {len(view_data)}.'
+    )
+
+
+@handle_db_errors
+def create_index(metadata, table_name, column, index_type):
+    """
+    Создает индекс по столбцу таблицы.
+    Префиксный индекс ускоряет условия like/ilike вида 'abc%'.
+    """
+    if table_name not in metadata:
+        return False, f'Таблица "{table_name}" не существует.'
+    
+    table_meta = metadata[table_name]
+    if 'view' in table_meta:
+        return False, f'"{table_name}" — представление, индексы для него не создаются.'
+    
+    if index_type not in INDEX_TYPES:
+        return False, (
+            f"Неподдерживаемый тип индекса: {index_type}. "
+            f"Поддерживаемые типы: {', '.join(INDEX_TYPES)}"
+        )
+    
+    column_types = dict(col.split(':', 1) for col in table_meta['columns'])
+    if column not in column_types:
+        return False, f'Столбец "{column}" не существует в таблице "{table_name}".'
+    if column_types[column] != 'str':
+        return False, "Префиксный индекс можно создать только для столбца типа str."
+    
+    indexes = table_meta.setdefault('indexes', {})
+    if column in indexes:
+        return False, f'Индекс по столбцу "{column}" уже существует.'
+    
+    with database_lock():
+        table_data = load_table_data(table_name, table_meta=table_meta)
+        save_index(table_name, column, build_prefix_index(table_data, column))
+    indexes[column] = index_type
+    cache_result.clear()
+    
+    return True, (
+        f'Индекс {index_type} по столбцу "{column}" таблицы "{table_name}" создан.'
+    )
+
+
+@handle_db_errors
+@log_time
+def backup(backup_dir):
+    """
+    Создает резервную копию базы в директории.
+    Повторные копии в ту же директорию инкрементальны.
+    """
+    manifest = create_backup(backup_dir)
+    return True, (
+        f'Резервная копия {manifest["id"]} создана в "{backup_dir}": '
+        f'таблиц {len(manifest["tables"])}, скопировано '
+        f'{manifest["copied_bytes"]} из {manifest["total_bytes"]} байт.'
+    )
+
+
+@handle_db_errors
+@confirm_action("восстановление из резервной копии", "директории", position=0)
+@log_time
+def restore(backup_dir, backup_id=None):
+    """
+    Восстанавливает базу из резервной копии.
+    Перезаписываются только изменившиеся таблицы.
+    """
+    manifest, restored, unchanged = restore_backup(backup_dir, backup_id)
+    cache_result.clear()
+    
+    # Индексы не входят в копию и строятся заново по восстановленным данным
+    metadata = load_metadata()
+    with database_lock():
+        for table_name, table_meta in metadata.items():
+            if table_meta.get('indexes'):
+                table_data = load_table_data(table_name, table_meta=table_meta)
+                for column in table_meta['indexes']:
+                    index = build_prefix_index(table_data, column)
+                    save_index(table_name, column, index)
+    
+    restored_str = ", ".join(restored) if restored else "нет"
+    return True, (
+        f'База восстановлена из копии {manifest["id"]}. '
+        f'Восстановлены таблицы: {restored_str}; без изменений: {unchanged}.'
+    )
@@ -24,19 +24,20 @@ def handle_db_errors(func):
     return wrapper
 
 
-def confirm_action(action_name):
+def confirm_action(action_name, target="таблицы", position=1):
     """
     Декоратор для подтверждения опасных операций.
+    target — что изменяет операция, position — номер аргумента с его именем.
     """
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
             # Для функций в core.py, первый аргумент - metadata, второй - table_name
-            table_name = args[1] if len(args) > 1 else "неизвестная таблица"
+            name = args[position] if len(args) > position else "неизвестная таблица"
             
             response = input(
                 f'Вы уверены, что хотите выполнить "{action_name}" '
-                f'для таблицы "{table_name}"? [y/N]: '
+                f'для {target} "{name}"? [y/N]: '
             )
             if response.lower() not in ['y', 'yes', 'д', 'да']:
                 return False, "Операция отменена пользователем."
@@ -79,4 +80,7 @@ def create_cacher():
         cache[key] = result
         return result
     
+    # Сброс кэша после изменения данных
+    cache_result.clear = cache.clear
+    
     return cache_result
\ No newline at end of file
@@ -1,18 +1,30 @@
 import shlex
+from collections.abc import Iterator
 
 import prompt
 
 from .core import (
+    backup,
+    create_index,
     create_table,
+    create_view,
     delete,
     drop_table,
     info_table,
     insert,
     list_tables,
+    refresh_view,
+    restore,
     select,
     update,
 )
-from .parser import parse_set_clause, parse_values_list, parse_where_condition
+from .parser import (
+    parse_order_clause,
+    parse_set_clause,
+    parse_values_list,
+    parse_view_query,
+    parse_where_condition,
+)
 from .utils import load_metadata, save_metadata
 
 
@@ -25,8 +37,8 @@ def print_help():
         "создать запись"
     )
     print(
-        "<command> select from <имя_таблицы> [where <условие>] - "
-        "прочитать записи"
+        "<command> select from <имя_таблицы> [where <условие>] "
+        "[order by <столбец> [desc]] [limit <n>] - прочитать записи"
     )
     print(
         "<command> update <имя_таблицы> set <столбец=значение> "
@@ -43,6 +55,20 @@ def print_help():
     )
     print("<command> list_tables - показать список всех таблиц")
     print("<command> drop_table <имя_таблицы> - удалить таблицу")
+    print(
+        "<command> create_view <имя> as select from <таблица> "
+        "[where <условие>] [group by <столбец>] - создать представление"
+    )
+    print("<command> refresh_view <имя> - пересчитать представление")
+    print(
+        "<command> create_index <имя_таблицы> <столбец> prefix - "
+        "создать префиксный индекс (для where <столбец> like 'abc%')"
+    )
+    print("<command> backup <директория> - создать резервную копию")
+    print(
+        "<command> restore <директория> [<идентификатор>] - "
+        "восстановить из резервной копии"
+    )
     print("<command> exit - выход из программы")
     print("<command> help - справочная информация\n")
 
@@ -107,6 +133,69 @@ def run():
                 if success:
                     save_metadata(metadata)
                     
+            elif command == 'create_view':
+                if len(args) < 5 or args[1].lower() != 'as':
+                    print("Ошибка: Неверный формат команды CREATE_VIEW")
+                    print(
+                        "Использование: create_view <имя> as select from "
+                        "<таблица> [where <условие>] [group by <столбец>]"
+                    )
+                    continue
+                
+                view_name = args[0]
+                try:
+                    source, where_clause, group_by = parse_view_query(args[2:])
+                except Exception as e:
+                    print(f"Ошибка: {e}")
+                    continue
+                
+                success, message = create_view(
+                    metadata, view_name, source, where_clause, group_by
+                )
+                print(message)
+                
+                if success:
+                    save_metadata(metadata)
+                    
+            elif command == 'refresh_view':
+                if len(args) != 1:
+                    print("Ошибка: Неверное количество аргументов")
+                    print("Использование: refresh_view <имя>")
+                    continue
+                
+                success, message = refresh_view(metadata, args[0])
+                print(message)
+                
+            elif command == 'create_index':
+                if len(args) != 3:
+                    print("Ошибка: Неверное количество аргументов")
+                    print("Использование: create_index <таблица> <столбец> prefix")
+                    continue
+                
+                success, message = create_index(metadata, *args)
+                print(message)
+                
+                if success:
+                    save_metadata(metadata)
+                    
+            elif command == 'backup':
+                if len(args) != 1:
+                    print("Ошибка: Неверное количество аргументов")
+                    print("Использование: backup <директория>")
+                    continue
+                
+                success, message = backup(args[0])
+                print(message)
+                
+            elif command == 'restore':
+                if len(args) not in (1, 2):
+                    print("Ошибка: Неверное количество аргументов")
+                    print("Использование: restore <директория> [<идентификатор>]")
+                    continue
+                
+                success, message = restore(*args)
+                print(message)
+                
             elif command == 'list_tables':
                 result = list_tables(metadata)
                 print(result)
@@ -136,28 +225,40 @@ def run():
                     print("Ошибка: Неверный формат команды SELECT")
                     print(
                         "Использование: select from <таблица> "
-                        "[where <условие>]"
+                        "[where <условие>] [order by <столбец> [desc]] "
+                        "[limit <n>]"
                     )
                     continue
                 
                 table_name = args[1]
                 where_clause = None
                 
+                # Отделяем ORDER BY и LIMIT если есть
+                try:
+                    rest, order_by, descending, limit = parse_order_clause(
+                        args[2:]
+                    )
+                except Exception as e:
+                    print(f"Ошибка: {e}")
+                    continue
+                
                 # Обрабатываем условие WHERE если есть
-                if len(args) > 3 and args[2].lower() == 'where':
-                    where_str = ' '.join(args[3:])
+                if len(rest) > 1 and rest[0].lower() == 'where':
+                    where_str = ' '.join(rest[1:])
                     try:
                         where_clause = parse_where_condition(where_str)
                     except Exception as e:
                         print(f"Ошибка в условии WHERE: {e}")
                         continue
                 
-                success, result = select(metadata, table_name, where_clause)
-                if success:
-                    if isinstance(result, str):
-                        print(result)
-                    else:
-                        print(result)
+                success, result = select(
+                    metadata, table_name, where_clause,
+                    order_by, descending, limit,
+                )
+                if success and isinstance(result, Iterator):
+                    # Отсортированный результат выводится построчно
+                    for line in result:
+                        print(line)
                 else:
                     print(result)
                     
@@ -0,0 +1,251 @@
+import json
+import os
+from bisect import bisect_left, bisect_right
+from contextlib import suppress
+from heapq import merge
+
+from .utils import write_file_atomic
+
+# Поддерживаемые типы индексов
+INDEX_TYPES = {'prefix'}
+
+# Поддиректория данных для файлов индексов
+INDEX_DIR = 'indexes'
+
+# Сколько изменений может накопиться в журнале, прежде чем индекс
+# будет переписан целиком (не меньше этой доли от размера индекса)
+JOURNAL_MIN_ENTRIES = 1000
+JOURNAL_RATIO = 0.1
+
+# С какого числа изменений они применяются слиянием, а не вставками
+BULK_THRESHOLD = 64
+
+# Загруженные индексы: путь -> (отпечаток файлов, индекс, длина журнала)
+_loaded = {}
+
+
+def index_path(table_name, column, data_dir="data"):
+    return os.path.join(data_dir, INDEX_DIR, f"{table_name}.{column}.json")
+
+
+def journal_path(table_name, column, data_dir="data"):
+    return os.path.join(data_dir, INDEX_DIR, f"{table_name}.{column}.log")
+
+
+def _signature(paths):
+    """
+    Отпечаток файлов индекса и журнала: inode, размер и время изменения.
+    """
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            signature.append(None)
+        else:
+            signature.append((stat.st_ino, stat.st_size, stat.st_mtime_ns))
+    return tuple(signature)
+
+
+def build_prefix_index(records, column):
+    """
+    Строит префиксный индекс: отсортированный массив ключей
+    (строк в casefold) и параллельный массив ID записей.
+    """
+    pairs = sorted(
+        (record[column].casefold(), record['ID'])
+        for record in records
+        if isinstance(record.get(column), str)
+    )
+    return {
+        'keys': [key for key, _ in pairs],
+        'ids': [record_id for _, record_id in pairs],
+    }
+
+
+def _read_journal(path):
+    """
+    Читает записи журнала. Строка, недописанная при сбое, пропускается.
+    """
+    entries = []
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                with suppress(json.JSONDecodeError):
+                    entries.extend(json.loads(line))
+    except FileNotFoundError:
+        pass
+    return entries
+
+
+def _load(table_name, column, data_dir):
+    """
+    Возвращает (индекс, длина журнала), перечитывая файлы,
+    только если они изменились с прошлой загрузки.
+    """
+    paths = (
+        index_path(table_name, column, data_dir),
+        journal_path(table_name, column, data_dir),
+    )
+    signature = _signature(paths)
+    loaded = _loaded.get(paths[0])
+    if loaded is not None and loaded[0] == signature:
+        return loaded[1], loaded[2]
+
+    with open(paths[0], 'r', encoding='utf-8') as file:
+        index = json.load(file)
+    entries = _read_journal(paths[1])
+    _apply_entries(index, entries)
+    _loaded[paths[0]] = (signature, index, len(entries))
+    return index, len(entries)
+
+
+def load_index(table_name, column, data_dir="data"):
+    """
+    Загружает индекс вместе с журналом изменений.
+    Индекс хранится в памяти процесса и перечитывается с диска,
+    только если файлы изменились.
+    """
+    return _load(table_name, column, data_dir)[0]
+
+
+def save_index(table_name, column, index, data_dir="data"):
+    """
+    Записывает индекс целиком и очищает журнал изменений.
+    """
+    os.makedirs(os.path.join(data_dir, INDEX_DIR), exist_ok=True)
+    paths = (
+        index_path(table_name, column, data_dir),
+        journal_path(table_name, column, data_dir),
+    )
+    _loaded.pop(paths[0], None)
+    text = json.dumps(index, ensure_ascii=False, separators=(',', ':'))
+    write_file_atomic(paths[0], text.encode('utf-8'))
+    with suppress(FileNotFoundError):
+        os.unlink(paths[1])
+    _loaded[paths[0]] = (_signature(paths), index, 0)
+
+
+def _key(record, column):
+    if record is None or not isinstance(record.get(column), str):
+        return None
+    return record[column].casefold()
+
+
+def index_entries(changes, column):
+    """
+    Переводит изменения таблицы в записи журнала индекса
+    [старый ключ, новый ключ, ID]. Изменения, не затрагивающие
+    ключ столбца, пропускаются.
+    changes — список пар (старая запись, новая запись).
+    """
+    entries = []
+    for old, new in changes:
+        old_key, new_key = _key(old, column), _key(new, column)
+        if old_key != new_key:
+            record_id = (new if new is not None else old)['ID']
+            entries.append([old_key, new_key, record_id])
+    return entries
+
+
+def _find(index, key, record_id):
+    """
+    Возвращает позицию пары (ключ, ID) и признак, что она есть в индексе.
+    """
+    keys, ids = index['keys'], index['ids']
+    lo = bisect_left(keys, key)
+    hi = bisect_right(keys, key, lo)
+    position = bisect_left(ids, record_id, lo, hi)
+    return position, position < hi and ids[position] == record_id
+
+
+def _apply_entries(index, entries):
+    """
+    Применяет записи журнала к индексу. Немного изменений вносится
+    вставками в массивы, много — одним слиянием с отсортированными
+    добавленными парами. Повторное применение записи ничего не меняет.
+    """
+    if len(entries) < BULK_THRESHOLD:
+        for old_key, new_key, record_id in entries:
+            if old_key is not None:
+                position, found = _find(index, old_key, record_id)
+                if found:
+                    del index['keys'][position]
+                    del index['ids'][position]
+            if new_key is not None:
+                position, found = _find(index, new_key, record_id)
+                if not found:
+                    index['keys'].insert(position, new_key)
+                    index['ids'].insert(position, record_id)
+        return index
+
+    removed = set()
+    added = set()
+    for old_key, new_key, record_id in entries:
+        if old_key is not None:
+            added.discard((old_key, record_id))
+            removed.add((old_key, record_id))
+        if new_key is not None:
+            removed.discard((new_key, record_id))
+            added.add((new_key, record_id))
+
+    kept = (
+        pair for pair in zip(index['keys'], index['ids'])
+        if pair not in removed and pair not in added
+    )
+    pairs = list(merge(kept, sorted(added)))
+    index['keys'] = [key for key, _ in pairs]
+    index['ids'] = [record_id for _, record_id in pairs]
+    return index
+
+
+def update_index(table_name, column, changes, data_dir="data"):
+    """
+    Применяет изменения таблицы к индексу.
+    Если ключи столбца не изменились, индекс не читается и не пишется.
+    Иначе изменения дописываются в журнал, а индекс переписывается
+    целиком, только когда журнал становится слишком длинным.
+    """
+    entries = index_entries(changes, column)
+    if not entries:
+        return
+
+    paths = (
+        index_path(table_name, column, data_dir),
+        journal_path(table_name, column, data_dir),
+    )
+    index, journal_length = _load(table_name, column, data_dir)
+    # Индекс меняется на месте — до записи журнала он не считается загруженным
+    _loaded.pop(paths[0], None)
+    _apply_entries(index, entries)
+
+    journal_length += len(entries)
+    limit = max(JOURNAL_MIN_ENTRIES, int(len(index['keys']) * JOURNAL_RATIO))
+    if journal_length > limit:
+        save_index(table_name, column, index, data_dir)
+        return
+
+    line = json.dumps(entries, ensure_ascii=False, separators=(',', ':'))
+    # Каждая запись начинается с перевода строки, поэтому строка,
+    # оборванная при сбое, не склеивается со следующей
+    with open(paths[1], 'a', encoding='utf-8') as file:
+        file.write('\n' + line)
+    _loaded[paths[0]] = (_signature(paths), index, journal_length)
+
+
+def lookup_prefix(index, prefix):
+    """
+    Возвращает ID записей, у которых значение начинается с префикса
+    без учета регистра. Начало диапазона ищется двоичным поиском,
+    затем перебираются только совпадения.
+    """
+    prefix = prefix.casefold()
+    keys, ids = index['keys'], index['ids']
+    position = bisect_left(keys, prefix)
+    found = []
+    while position < len(keys) and keys[position].startswith(prefix):
+        found.append(ids[position])
+        position += 1
+    return found
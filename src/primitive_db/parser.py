@@ -1,10 +1,14 @@
 import shlex
 
+# Операторы условия WHERE
+WHERE_OPERATORS = ('=', 'like', 'ilike')
+
 
 def parse_where_condition(where_clause):
     """
-    Парсит условие WHERE в формате "столбец = значение".
-    Возвращает словарь {column: value}.
+    Парсит условие WHERE в формате "столбец = значение"
+    или "столбец like шаблон" / "столбец ilike шаблон".
+    Возвращает словарь {column: value} или {column: {оператор: шаблон}}.
     """
     if not where_clause:
         return None
@@ -12,12 +16,17 @@ def parse_where_condition(where_clause):
     try:
         # Разбиваем на части
         parts = shlex.split(where_clause)
-        if len(parts) != 3 or parts[1] != '=':
+        if len(parts) != 3 or parts[1].lower() not in WHERE_OPERATORS:
             raise ValueError("Некорректный формат условия WHERE")
         
         column = parts[0]
+        operator = parts[1].lower()
         value_str = parts[2]
         
+        # Шаблон like/ilike всегда строка
+        if operator != '=':
+            return {column: {operator: value_str}}
+        
         # Пробуем преобразовать значение
         value = parse_value(value_str)
         
@@ -97,4 +106,76 @@ def parse_values_list(values_str):
         parts = shlex.split(values_str.replace(',', ' '))
         return [parse_value(part) for part in parts]
     except Exception as e:
-        raise ValueError(f"Ошибка парсинга списка значений: {e}")
\ No newline at end of file
+        raise ValueError(f"Ошибка парсинга списка значений: {e}")
+
+
+def parse_view_query(parts):
+    """
+    Парсит запрос представления в формате
+    "select from <таблица> [where <условие>] [group by <столбец>]".
+    Принимает список слов, возвращает (таблица, where, group_by).
+    """
+    lowered = [part.lower() for part in parts]
+    if len(parts) < 3 or lowered[0] != 'select' or lowered[1] != 'from':
+        raise ValueError(
+            "Запрос представления должен начинаться с select from <таблица>"
+        )
+    
+    source = parts[2]
+    rest = parts[3:]
+    lowered = lowered[3:]
+    
+    # Отделяем GROUP BY, если есть
+    group_by = None
+    for i in range(len(rest) - 1):
+        if lowered[i] == 'group' and lowered[i + 1] == 'by':
+            if len(rest) != i + 3:
+                raise ValueError("После group by должен быть один столбец")
+            group_by = rest[i + 2]
+            rest = rest[:i]
+            lowered = lowered[:i]
+            break
+    
+    where_clause = None
+    if rest:
+        if lowered[0] != 'where' or len(rest) < 2:
+            raise ValueError("Некорректный формат запроса представления")
+        where_clause = parse_where_condition(' '.join(rest[1:]))
+    
+    return source, where_clause, group_by
+
+
+def parse_order_clause(parts):
+    """
+    Отделяет от конца запроса "order by <столбец> [asc|desc]" и "limit <n>".
+    Принимает список слов, возвращает
+    (оставшиеся слова, столбец, по убыванию, лимит).
+    """
+    lowered = [part.lower() for part in parts]
+    
+    limit = None
+    if len(parts) >= 2 and lowered[-2] == 'limit':
+        try:
+            limit = int(parts[-1])
+        except ValueError:
+            raise ValueError(f"Некорректное значение limit: {parts[-1]}")
+        parts = parts[:-2]
+        lowered = lowered[:-2]
+    
+    order_by = None
+    descending = False
+    for i in range(len(parts) - 1):
+        if lowered[i] == 'order' and lowered[i + 1] == 'by':
+            tail = parts[i + 2:]
+            if len(tail) == 2 and tail[1].lower() in ('asc', 'desc'):
+                descending = tail[1].lower() == 'desc'
+            elif len(tail) != 1:
+                raise ValueError(
+                    "После order by должен быть столбец и, при необходимости, "
+                    "asc или desc"
+                )
+            order_by = tail[0]
+            parts = parts[:i]
+            break
+    
+    return parts, order_by, descending, limit
@@ -0,0 +1,96 @@
+import re
+
+# Операторы сравнения строк по шаблону
+LIKE_OPERATORS = ('like', 'ilike')
+
+
+def prefix_of(pattern):
+    """
+    Возвращает префикс, если шаблон имеет вид "abc%"
+    и других подстановочных символов в нем нет. Иначе None.
+    """
+    if pattern.endswith('%'):
+        prefix = pattern[:-1]
+        if '%' not in prefix and '_' not in prefix:
+            return prefix
+    return None
+
+
+def like_matcher(pattern, ignore_case=False):
+    """
+    Возвращает функцию проверки строки по шаблону LIKE:
+    % — любая последовательность символов, _ — один символ.
+    """
+    if ignore_case:
+        pattern = pattern.casefold()
+
+    prefix = prefix_of(pattern)
+    if prefix is not None:
+        if ignore_case:
+            return lambda value: (
+                isinstance(value, str) and value.casefold().startswith(prefix)
+            )
+        return lambda value: isinstance(value, str) and value.startswith(prefix)
+
+    regex = re.compile(
+        ''.join(
+            '.*' if char == '%' else '.' if char == '_' else re.escape(char)
+            for char in pattern
+        ),
+        re.DOTALL,
+    )
+    if ignore_case:
+        return lambda value: (
+            isinstance(value, str) and regex.fullmatch(value.casefold()) is not None
+        )
+    return lambda value: isinstance(value, str) and regex.fullmatch(value) is not None
+
+
+def compile_where(where_clause, dictionaries=None):
+    """
+    Строит функцию-предикат для условия WHERE.
+    Значение условия — либо значение для сравнения на равенство,
+    либо {'like': шаблон} / {'ilike': шаблон}.
+    Для столбцов со словарным кодированием условие заранее
+    переводится в коды, и при сканировании сравниваются целые числа.
+    """
+    if not where_clause:
+        return lambda record: True
+
+    dictionaries = dictionaries or {}
+    equals = []
+    checks = []
+    for column, value in where_clause.items():
+        dictionary = dictionaries.get(column)
+
+        if isinstance(value, dict):
+            (operator, pattern), = value.items()
+            check = like_matcher(pattern, ignore_case=(operator == 'ilike'))
+            if dictionary is not None:
+                # Проверяем шаблон по словарю один раз, а не для каждой записи
+                codes = {
+                    code for code, item in enumerate(dictionary) if check(item)
+                }
+                if not codes:
+                    return lambda record: False
+                check = codes.__contains__
+            checks.append((column, check))
+            continue
+
+        if dictionary is not None:
+            if value not in dictionary:
+                # Значения нет в словаре — ни одна запись не подойдет
+                return lambda record: False
+            value = dictionary.index(value)
+        equals.append((column, value))
+
+    def matches(record):
+        for column, value in equals:
+            if record.get(column) != value:
+                return False
+        for column, check in checks:
+            if not check(record.get(column)):
+                return False
+        return True
+
+    return matches
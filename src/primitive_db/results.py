@@ -0,0 +1,158 @@
+import heapq
+import os
+import pickle
+import tempfile
+from itertools import islice
+
+# Сколько строк сортируется в памяти, прежде чем отсортированный
+# отрезок сбрасывается во временный файл
+DEFAULT_SORT_BUFFER = 100_000
+
+# Переменная окружения для изменения размера буфера сортировки
+SORT_BUFFER_ENV = 'PRIMITIVE_DB_SORT_BUFFER'
+
+# Сколько строк записывается во временный файл за один вызов pickle
+SPILL_BLOCK_SIZE = 1000
+
+
+def get_sort_buffer():
+    """
+    Возвращает размер буфера сортировки в строках.
+    """
+    value = os.environ.get(SORT_BUFFER_ENV)
+    if value is None:
+        return DEFAULT_SORT_BUFFER
+    buffer_size = int(value)
+    if buffer_size < 1:
+        raise ValueError(f"{SORT_BUFFER_ENV} должна быть положительным числом")
+    return buffer_size
+
+
+def _make_key(position):
+    """
+    Ключ сортировки по столбцу; пустые значения идут первыми.
+    """
+    return lambda row: (row[position] is not None, row[position])
+
+
+def _spill(rows):
+    """
+    Записывает отсортированный отрезок во временный файл блоками.
+    """
+    file = tempfile.TemporaryFile()
+    for start in range(0, len(rows), SPILL_BLOCK_SIZE):
+        pickle.dump(rows[start:start + SPILL_BLOCK_SIZE], file)
+    return file
+
+
+def _read_run(file):
+    """
+    Читает строки отрезка из временного файла.
+    """
+    file.seek(0)
+    while True:
+        try:
+            block = pickle.load(file)
+        except EOFError:
+            return
+        yield from block
+
+
+class SortedRuns:
+    """
+    Результат внешней сортировки.
+    Хранит отсортированные отрезки (в памяти или во временных файлах)
+    и при каждом проходе сливает их через heapq.merge, поэтому
+    результат можно читать несколько раз, не держа его в памяти.
+    """
+
+    def __init__(self, runs, files, count, key, descending):
+        self._runs = runs
+        self._files = files
+        self._count = count
+        self._key = key
+        self._descending = descending
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        sources = self._runs + [_read_run(file) for file in self._files]
+        if len(sources) == 1:
+            return iter(sources[0])
+        return heapq.merge(*sources, key=self._key, reverse=self._descending)
+
+    def close(self):
+        for file in self._files:
+            file.close()
+        self._files = []
+
+
+def external_sort(rows, position, descending=False, buffer_size=None):
+    """
+    Сортирует строки по столбцу с ограниченной памятью.
+    Строки читаются порциями по buffer_size, каждая порция сортируется
+    и, если строк больше одной порции, сбрасывается во временный файл.
+    """
+    buffer_size = buffer_size or get_sort_buffer()
+    key = _make_key(position)
+
+    files = []
+    count = 0
+    while True:
+        chunk = list(islice(rows, buffer_size))
+        if not chunk:
+            break
+        count += len(chunk)
+        chunk.sort(key=key, reverse=descending)
+        if not files and len(chunk) < buffer_size:
+            # Все строки поместились в буфер — обходимся без файлов
+            return SortedRuns([chunk], [], count, key, descending)
+        files.append(_spill(chunk))
+
+    return SortedRuns([], files, count, key, descending)
+
+
+def top_n(rows, position, limit, descending=False):
+    """
+    Возвращает первые limit строк в порядке сортировки.
+    Использует кучу размера limit вместо полной сортировки.
+    """
+    key = _make_key(position)
+    if descending:
+        return heapq.nlargest(limit, rows, key=key)
+    return heapq.nsmallest(limit, rows, key=key)
+
+
+def _cell_text(value):
+    return '' if value is None else str(value)
+
+
+def _format_line(cells, widths):
+    return '| ' + ' | '.join(
+        _cell_text(cell).center(width) for cell, width in zip(cells, widths)
+    ) + ' |'
+
+
+def stream_table(columns, rows):
+    """
+    Построчно выводит таблицу в стиле PrettyTable.
+    Первый проход по rows вычисляет ширину столбцов, второй выводит
+    строки, поэтому весь результат не собирается в памяти.
+    """
+    try:
+        widths = [len(column) for column in columns]
+        for row in rows:
+            for i, value in enumerate(row):
+                widths[i] = max(widths[i], len(_cell_text(value)))
+
+        border = '+' + '+'.join('-' * (width + 2) for width in widths) + '+'
+        yield border
+        yield _format_line(columns, widths)
+        yield border
+        for row in rows:
+            yield _format_line(row, widths)
+        yield border
+    finally:
+        if hasattr(rows, 'close'):
+            rows.close()
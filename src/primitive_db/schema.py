@@ -0,0 +1,191 @@
+import keyword
+
+# Проверки значений для поддерживаемых типов столбцов
+COLUMN_CHECKERS = {
+    'int': lambda value: isinstance(value, int),
+    'str': lambda value: isinstance(value, str),
+    'bool': lambda value: isinstance(value, bool),
+}
+
+# Кэш скомпилированных классов строк и валидаторов по схеме таблицы
+_row_classes = {}
+_validators = {}
+_set_validators = {}
+
+
+class BaseRow:
+    """
+    Базовый класс строки таблицы.
+    Поддерживает доступ к столбцам как к атрибутам (row.name)
+    и как к ключам словаря (row['name'], row.get('name')).
+    Присваивание через row['name'] = value проверяет тип значения.
+    """
+    __slots__ = ()
+    _fields = ()
+    _types = {}
+
+    def __getitem__(self, name):
+        try:
+            return getattr(self, name)
+        except AttributeError:
+            raise KeyError(name)
+
+    def __setitem__(self, name, value):
+        if name not in self._types:
+            raise KeyError(name)
+        col_type = self._types[name]
+        if value is not None and not COLUMN_CHECKERS[col_type](value):
+            raise ValueError(f"Столбец '{name}' должен быть типа {col_type}")
+        setattr(self, name, value)
+
+    def get(self, name, default=None):
+        return getattr(self, name, default)
+
+    def keys(self):
+        return self._fields
+
+    def values(self):
+        return [getattr(self, name) for name in self._fields]
+
+    def items(self):
+        return [(name, getattr(self, name)) for name in self._fields]
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __eq__(self, other):
+        if isinstance(other, (BaseRow, dict)):
+            return dict(self.items()) == dict(other.items())
+        return NotImplemented
+
+    def __repr__(self):
+        values = ', '.join(f"{name}={value!r}" for name, value in self.items())
+        return f"{type(self).__name__}({values})"
+
+
+# Имена, которые нельзя использовать как имена столбцов строк
+RESERVED_NAMES = {name for name in dir(BaseRow) if not name.startswith('_')}
+
+
+def is_valid_column_name(name):
+    """
+    Проверяет, что имя столбца можно использовать как атрибут строки.
+    """
+    return (
+        name.isidentifier()
+        and not keyword.iskeyword(name)
+        and not name.startswith('_')
+        and name not in RESERVED_NAMES
+    )
+
+
+def parse_columns(table_meta):
+    """
+    Возвращает список пар (имя, тип) из определения таблицы.
+    """
+    return [tuple(col.split(':', 1)) for col in table_meta['columns']]
+
+
+def make_row_class(table_name, columns):
+    """
+    Компилирует класс строки со __slots__ для схемы таблицы.
+    Конструктор принимает значения в порядке столбцов и не проверяет
+    типы (используется при загрузке уже сохраненных данных).
+    """
+    names = tuple(name for name, _ in columns)
+    arguments = ', '.join(names)
+    body = ''.join(f"    self.{name} = {name}\n" for name in names) or "    pass\n"
+    namespace = {}
+    exec(f"def __init__(self, {arguments}):\n{body}", namespace)
+
+    class_name = f"{table_name.title().replace('_', '')}Row"
+    if not class_name.isidentifier():
+        class_name = 'Row'
+    return type(class_name, (BaseRow,), {
+        '__slots__': names,
+        '__init__': namespace['__init__'],
+        '_fields': names,
+        '_types': dict(columns),
+    })
+
+
+def get_row_class(table_name, table_meta):
+    """
+    Возвращает класс строки для таблицы.
+    Если имена столбцов не подходят для атрибутов или повторяются,
+    возвращает None, и записи хранятся в виде словарей.
+    """
+    columns = tuple(parse_columns(table_meta))
+    key = (table_name, columns)
+    if key not in _row_classes:
+        names = [name for name, _ in columns]
+        if (
+            all(is_valid_column_name(name) for name in names)
+            and len(set(names)) == len(names)
+        ):
+            _row_classes[key] = make_row_class(table_name, columns)
+        else:
+            _row_classes[key] = None
+    return _row_classes[key]
+
+
+def get_validator(table_meta):
+    """
+    Возвращает скомпилированную функцию проверки значений для вставки.
+    Функция принимает значения без ID и возвращает (успех, сообщение).
+    """
+    columns = tuple(parse_columns(table_meta))[1:]  # Пропускаем ID
+    if columns in _validators:
+        return _validators[columns]
+
+    checks = [
+        (COLUMN_CHECKERS[col_type], f"Столбец '{name}' должен быть типа {col_type}")
+        for name, col_type in columns
+    ]
+    expected = len(checks)
+
+    def validate(values):
+        if len(values) != expected:
+            return False, (
+                f"Неверное количество значений. Ожидается {expected}, "
+                f"получено {len(values)}"
+            )
+        for (check, error_msg), value in zip(checks, values):
+            if not check(value):
+                return False, error_msg
+        return True, "OK"
+
+    _validators[columns] = validate
+    return validate
+
+
+def get_set_validator(table_meta):
+    """
+    Возвращает скомпилированную функцию проверки значений для обновления.
+    Функция принимает словарь {столбец: значение} и возвращает
+    (успех, сообщение); столбцы должны существовать в таблице.
+    """
+    columns = tuple(parse_columns(table_meta))
+    if columns in _set_validators:
+        return _set_validators[columns]
+
+    checks = {
+        name: (
+            COLUMN_CHECKERS[col_type],
+            f"Столбец '{name}' должен быть типа {col_type}",
+        )
+        for name, col_type in columns
+    }
+
+    def validate(values):
+        for name, value in values.items():
+            check, error_msg = checks[name]
+            if not check(value):
+                return False, error_msg
+        return True, "OK"
+
+    _set_validators[columns] = validate
+    return validate
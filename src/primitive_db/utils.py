@@ -1,5 +1,453 @@
 import json
+import lzma
 import os
+import struct
+import zlib
+from collections import namedtuple
+from contextlib import contextmanager, suppress
+from itertools import starmap
+
+from .schema import COLUMN_CHECKERS, get_row_class, parse_columns
+
+try:
+    import orjson
+except ImportError:  # orjson — необязательная зависимость
+    orjson = None
+
+try:
+    import fcntl
+except ImportError:  # блокировки файлов доступны не на всех платформах
+    fcntl = None
+
+
+# Кодек таблицы: функции кодирования записей в байты и обратно.
+# encode(records, columns) -> bytes, decode(raw) -> (имена столбцов, строки)
+Codec = namedtuple('Codec', ['encode', 'decode'])
+
+# Алгоритм сжатия: compress(data, level) -> bytes, decompress(data) -> bytes
+Compressor = namedtuple('Compressor', ['compress', 'decompress'])
+
+# Кодек по умолчанию для таблиц без ключа "codec" в метаданных
+LEGACY_CODEC = 'json'
+
+# Кодек для новых таблиц
+DEFAULT_CODEC = 'rows'
+
+# Сигнатура бинарного формата
+BINARY_MAGIC = b'PDB1'
+
+# Сигнатура контейнера со сжатием и/или словарным кодированием
+CONTAINER_MAGIC = b'PDBC'
+
+# Уровень сжатия, если он не задан в метаданных
+DEFAULT_COMPRESSION_LEVEL = 6
+
+# Файл блокировки базы в директории данных
+LOCK_FILE = '.lock'
+
+# Столбец кодируется словарем, если уникальных значений не больше
+# этой доли от числа записей
+DICTIONARY_MAX_RATIO = 0.5
+
+# Форматы struct для типов столбцов (str хранится как длина + байты)
+_STRUCT_FORMATS = {'int': 'q', 'bool': '?', 'str': 'I'}
+
+
+def _json_loads(raw):
+    """
+    Разбирает JSON, используя orjson, если он установлен.
+    """
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw.decode('utf-8'))
+
+
+def _encode_json(records, columns):
+    """
+    Исходный формат: список словарей с отступами.
+    """
+    text = json.dumps(records, ensure_ascii=False, indent=2, default=dict)
+    return text.encode('utf-8')
+
+
+def _rows_document(records, columns):
+    """
+    Строит документ с именами столбцов и строками-массивами значений.
+    """
+    names = [name for name, _ in columns]
+    return {
+        'columns': names,
+        'rows': [[record.get(name) for name in names] for record in records],
+    }
+
+
+def _encode_rows(records, columns):
+    """
+    Компактный JSON: имена столбцов один раз, далее только значения.
+    """
+    document = _rows_document(records, columns)
+    text = json.dumps(document, ensure_ascii=False, separators=(',', ':'))
+    return text.encode('utf-8')
+
+
+def _encode_orjson(records, columns):
+    """
+    Тот же формат, что и у "rows", но сериализованный через orjson.
+    Без установленного orjson используется стандартный json.
+    """
+    if orjson is None:
+        return _encode_rows(records, columns)
+    return orjson.dumps(_rows_document(records, columns), default=dict)
+
+
+def _decode_json(raw):
+    """
+    Читает как исходный список словарей, так и документ со строками.
+    """
+    document = _json_loads(raw)
+    if isinstance(document, list):
+        names = list(document[0]) if document else []
+        return names, [[record.get(name) for name in names] for record in document]
+    return document['columns'], document['rows']
+
+
+def _encode_binary(records, columns):
+    """
+    Бинарный формат на struct.
+    Заголовок: сигнатура, число строк, описание столбцов.
+    Строка: фиксированная часть (int, bool, длины str) и байты строк.
+    """
+    names = [name for name, _ in columns]
+    types = [col_type for _, col_type in columns]
+    row_struct = struct.Struct(
+        '<' + ''.join(_STRUCT_FORMATS[col_type] for col_type in types)
+    )
+    str_positions = [i for i, col_type in enumerate(types) if col_type == 'str']
+    # struct упаковывает в '?' любое значение, поэтому типы проверяются заранее
+    checks = [
+        (name, col_type, COLUMN_CHECKERS[col_type]) for name, col_type in columns
+    ]
+
+    header = [BINARY_MAGIC, struct.pack('<IH', len(records), len(columns))]
+    for name, col_type in columns:
+        encoded_name = name.encode('utf-8')
+        header.append(struct.pack('<B', len(encoded_name)))
+        header.append(encoded_name)
+        header.append(col_type[0].encode('ascii'))
+
+    chunks = header
+    for record in records:
+        values = [record[name] for name in names]
+        for (name, col_type, check), value in zip(checks, values):
+            if value is None or not check(value):
+                raise ValueError(
+                    f"Запись с ID={record.get('ID')} не соответствует схеме: "
+                    f"столбец '{name}' должен быть типа {col_type}"
+                )
+        strings = []
+        for i in str_positions:
+            encoded = values[i].encode('utf-8')
+            values[i] = len(encoded)
+            strings.append(encoded)
+        try:
+            chunks.append(row_struct.pack(*values))
+        except struct.error as e:
+            raise ValueError(
+                f"Запись с ID={record.get('ID')} не соответствует схеме: {e}"
+            )
+        chunks.extend(strings)
+    return b''.join(chunks)
+
+
+def _decode_binary(raw):
+    """
+    Разбирает бинарный формат, записанный _encode_binary.
+    """
+    offset = len(BINARY_MAGIC)
+    row_count, column_count = struct.unpack_from('<IH', raw, offset)
+    offset += struct.calcsize('<IH')
+
+    names = []
+    types = []
+    type_names = {'i': 'int', 'b': 'bool', 's': 'str'}
+    for _ in range(column_count):
+        name_length = raw[offset]
+        offset += 1
+        names.append(raw[offset:offset + name_length].decode('utf-8'))
+        offset += name_length
+        types.append(type_names[chr(raw[offset])])
+        offset += 1
+
+    row_struct = struct.Struct(
+        '<' + ''.join(_STRUCT_FORMATS[col_type] for col_type in types)
+    )
+    str_positions = [i for i, col_type in enumerate(types) if col_type == 'str']
+
+    rows = []
+    for _ in range(row_count):
+        values = list(row_struct.unpack_from(raw, offset))
+        offset += row_struct.size
+        for i in str_positions:
+            length = values[i]
+            values[i] = raw[offset:offset + length].decode('utf-8')
+            offset += length
+        rows.append(values)
+    return names, rows
+
+
+CODECS = {
+    'json': Codec(_encode_json, _decode_json),
+    'rows': Codec(_encode_rows, _decode_json),
+    'orjson': Codec(_encode_orjson, _decode_json),
+    'binary': Codec(_encode_binary, _decode_binary),
+}
+
+
+COMPRESSORS = {
+    'zlib': Compressor(
+        lambda data, level: zlib.compress(data, level), zlib.decompress
+    ),
+    'lzma': Compressor(
+        lambda data, level: lzma.compress(data, preset=level), lzma.decompress
+    ),
+}
+
+
+def get_codec(table_meta=None):
+    """
+    Возвращает имя и кодек таблицы согласно её метаданным.
+    """
+    name = (table_meta or {}).get('codec', LEGACY_CODEC)
+    if name not in CODECS:
+        raise ValueError(
+            f"Неизвестный кодек: {name}. "
+            f"Доступные кодеки: {', '.join(CODECS)}"
+        )
+    return name, CODECS[name]
+
+
+def get_compressor(table_meta=None):
+    """
+    Возвращает имя, алгоритм и уровень сжатия таблицы.
+    Если сжатие не задано, возвращает (None, None, None).
+    """
+    table_meta = table_meta or {}
+    name = table_meta.get('compression')
+    if not name:
+        return None, None, None
+    if name not in COMPRESSORS:
+        raise ValueError(
+            f"Неизвестный алгоритм сжатия: {name}. "
+            f"Доступные алгоритмы: {', '.join(COMPRESSORS)}"
+        )
+    level = table_meta.get('compression_level', DEFAULT_COMPRESSION_LEVEL)
+    return name, COMPRESSORS[name], level
+
+
+def build_dictionaries(records, columns, setting):
+    """
+    Строит словари для столбцов типа str.
+    setting: True — выбрать столбцы с малым числом уникальных значений,
+    список имен — кодировать указанные столбцы.
+    """
+    if not setting or not records:
+        return {}
+
+    candidates = [
+        name for name, col_type in columns
+        if col_type == 'str' and (setting is True or name in setting)
+    ]
+
+    limit = max(1, int(len(records) * DICTIONARY_MAX_RATIO))
+    dictionaries = {}
+    for name in candidates:
+        values = list(dict.fromkeys(record.get(name) for record in records))
+        if setting is True and len(values) > limit:
+            continue
+        dictionaries[name] = values
+    return dictionaries
+
+
+def encode_dictionaries(records, dictionaries):
+    """
+    Возвращает копии записей, где значения заменены кодами словаря.
+    """
+    codes = {
+        name: {value: code for code, value in enumerate(values)}
+        for name, values in dictionaries.items()
+    }
+    encoded = []
+    for record in records:
+        record = dict(record)
+        for name, mapping in codes.items():
+            record[name] = mapping[record.get(name)]
+        encoded.append(record)
+    return encoded
+
+
+def decode_dictionaries(records, dictionaries):
+    """
+    Заменяет коды словаря исходными значениями (на месте).
+    """
+    for name, values in dictionaries.items():
+        for record in records:
+            record[name] = values[record[name]]
+    return records
+
+
+def encode_table_data(data, table_meta=None):
+    """
+    Кодирует записи таблицы в байты согласно её метаданным.
+    """
+    _, codec = get_codec(table_meta)
+    if not table_meta:
+        return codec.encode(data, [])
+
+    columns = parse_columns(table_meta)
+    dictionaries = build_dictionaries(
+        data, columns, table_meta.get('dictionary')
+    )
+    if dictionaries:
+        data = encode_dictionaries(data, dictionaries)
+        columns = [
+            (name, 'int' if name in dictionaries else col_type)
+            for name, col_type in columns
+        ]
+    raw = codec.encode(data, columns)
+
+    compression, compressor, level = get_compressor(table_meta)
+    if not dictionaries and not compression:
+        return raw
+
+    if compression:
+        raw = compressor.compress(raw, level)
+    header = json.dumps(
+        {'compression': compression, 'dictionaries': dictionaries},
+        ensure_ascii=False,
+        separators=(',', ':'),
+    ).encode('utf-8')
+    return b''.join([
+        CONTAINER_MAGIC, struct.pack('<I', len(header)), header, raw
+    ])
+
+
+def build_records(names, rows, row_class=None):
+    """
+    Создает записи из строк-массивов значений.
+    С классом строки записи создаются его конструктором,
+    иначе — в виде словарей.
+    """
+    if row_class is None:
+        return [dict(zip(names, row)) for row in rows]
+    if tuple(names) != row_class._fields:
+        # Порядок столбцов в файле отличается от схемы
+        positions = [
+            names.index(name) if name in names else None
+            for name in row_class._fields
+        ]
+        rows = (
+            [row[i] if i is not None else None for i in positions]
+            for row in rows
+        )
+    return list(starmap(row_class, rows))
+
+
+def select_rows(names, rows, ids):
+    """
+    Оставляет строки с указанными ID в порядке таблицы.
+    Строки хранятся по возрастанию ID, поэтому каждая ищется
+    двоичным поиском; при нарушенном порядке строится словарь.
+    """
+    if 'ID' not in names:
+        return []
+    position = names.index('ID')
+    found = []
+    for record_id in sorted(ids):
+        lo, hi = 0, len(rows)
+        while lo < hi:
+            middle = (lo + hi) // 2
+            if rows[middle][position] < record_id:
+                lo = middle + 1
+            else:
+                hi = middle
+        if lo < len(rows) and rows[lo][position] == record_id:
+            found.append(rows[lo])
+        else:
+            by_id = {row[position]: row for row in rows}
+            return [by_id[i] for i in sorted(ids) if i in by_id]
+    return found
+
+
+def unpack_table_data(raw, row_class=None, ids=None):
+    """
+    Определяет формат по первым байтам и декодирует записи.
+    Столбцы со словарным кодированием остаются в виде кодов.
+    Если заданы ids, записи создаются только для строк с этими ID.
+    Возвращает (записи, словари).
+    """
+    dictionaries = {}
+    if raw.startswith(CONTAINER_MAGIC):
+        offset = len(CONTAINER_MAGIC)
+        (header_length,) = struct.unpack_from('<I', raw, offset)
+        offset += struct.calcsize('<I')
+        header = json.loads(raw[offset:offset + header_length].decode('utf-8'))
+        raw = raw[offset + header_length:]
+        if header['compression']:
+            raw = COMPRESSORS[header['compression']].decompress(raw)
+        dictionaries = header['dictionaries']
+
+    if raw.startswith(BINARY_MAGIC):
+        names, rows = _decode_binary(raw)
+    elif not raw.strip():
+        names, rows = [], []
+    else:
+        names, rows = _decode_json(raw)
+    if ids is not None:
+        rows = select_rows(names, rows, ids)
+    return build_records(names, rows, row_class), dictionaries
+
+
+def decode_table_data(raw, row_class=None):
+    """
+    Декодирует записи таблицы из байтов любого поддерживаемого формата.
+    """
+    records, dictionaries = unpack_table_data(raw, row_class)
+    return decode_dictionaries(records, dictionaries)
+
+
+def write_file_atomic(filepath, raw):
+    """
+    Записывает файл через временный файл и os.replace.
+    Читатель всегда видит либо старое, либо новое содержимое целиком.
+    """
+    directory, filename = os.path.split(filepath)
+    tmp_path = os.path.join(directory, f".{filename}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, 'wb') as file:
+            file.write(raw)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        # Временный файл мог не создаться, тогда важна исходная ошибка
+        with suppress(FileNotFoundError):
+            os.unlink(tmp_path)
+        raise
+
+
+@contextmanager
+def database_lock(data_dir="data"):
+    """
+    Эксклюзивная блокировка базы на время записи группы файлов
+    (таблица и ее представления) или снимка для резервной копии.
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    with open(os.path.join(data_dir, LOCK_FILE), 'a') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
 
 
 def load_metadata(filepath="db_meta.json"):
@@ -18,29 +466,49 @@ def save_metadata(data, filepath="db_meta.json"):
     """
     Сохраняет метаданные в JSON-файл.
     """
-    with open(filepath, 'w', encoding='utf-8') as file:
-        json.dump(data, file, ensure_ascii=False, indent=2)
+    text = json.dumps(data, ensure_ascii=False, indent=2)
+    write_file_atomic(filepath, text.encode('utf-8'))
 
 
-def load_table_data(table_name, data_dir="data"):
+def load_encoded_table_data(table_name, data_dir="data", table_meta=None,
+                            ids=None):
     """
-    Загружает данные таблицы из JSON-файла.
+    Загружает данные таблицы, не раскрывая словарное кодирование.
+    С метаданными записи создаются классом строки таблицы.
+    Если заданы ids, загружаются только записи с этими ID.
+    Возвращает (записи, словари).
     """
+    row_class = get_row_class(table_name, table_meta) if table_meta else None
     filepath = os.path.join(data_dir, f"{table_name}.json")
     try:
-        with open(filepath, 'r', encoding='utf-8') as file:
-            return json.load(file)
+        with open(filepath, 'rb') as file:
+            return unpack_table_data(file.read(), row_class, ids)
     except FileNotFoundError:
-        return []
+        return [], {}
 
 
-def save_table_data(table_name, data, data_dir="data"):
+def load_table_data(table_name, data_dir="data", table_meta=None):
+    """
+    Загружает данные таблицы из файла.
+    Формат (JSON, компактные строки, бинарный, сжатие) определяется
+    автоматически, поэтому старые файлы читаются без изменений.
     """
-    Сохраняет данные таблицы в JSON-файл.
+    records, dictionaries = load_encoded_table_data(
+        table_name, data_dir, table_meta
+    )
+    return decode_dictionaries(records, dictionaries)
+
+
+def save_table_data(table_name, data, data_dir="data", table_meta=None):
+    """
+    Сохраняет данные таблицы в файл кодеком, указанным в метаданных.
+    Без метаданных используется исходный JSON с отступами.
+    Файл заменяется атомарно, поэтому его копия никогда не бывает частичной.
     """
     # Создаем директорию, если не существует
     os.makedirs(data_dir, exist_ok=True)
-    
+
+    raw = encode_table_data(data, table_meta)
+
     filepath = os.path.join(data_dir, f"{table_name}.json")
-    with open(filepath, 'w', encoding='utf-8') as file:
-        json.dump(data, file, ensure_ascii=False, indent=2)
\ No newline at end of file
+    write_file_atomic(filepath, raw)
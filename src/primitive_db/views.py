@@ -0,0 +1,85 @@
+from .query import compile_where
+from .schema import parse_columns
+
+# Имя столбца с количеством записей в группе
+COUNT_COLUMN = 'count'
+
+
+def view_columns(source_meta, group_by=None):
+    """
+    Возвращает определения столбцов представления.
+    Без группировки — столбцы исходной таблицы,
+    с группировкой — столбец группировки и количество записей.
+    """
+    if not group_by:
+        return list(source_meta['columns'])
+    col_type = dict(parse_columns(source_meta))[group_by]
+    return [f"{group_by}:{col_type}", f"{COUNT_COLUMN}:int"]
+
+
+def _group_order(group_by):
+    """
+    Ключ сортировки групп по значению столбца группировки,
+    пустые значения идут первыми.
+    """
+    return lambda record: (record[group_by] is not None, record[group_by])
+
+
+def build_view(view_def, records):
+    """
+    Полностью вычисляет содержимое представления по записям таблицы.
+    """
+    matches = compile_where(view_def.get('where'))
+    selected = [record for record in records if matches(record)]
+
+    group_by = view_def.get('group_by')
+    if not group_by:
+        return selected
+
+    counts = {}
+    for record in selected:
+        key = record.get(group_by)
+        counts[key] = counts.get(key, 0) + 1
+    groups = [{group_by: key, COUNT_COLUMN: count} for key, count in counts.items()]
+    return sorted(groups, key=_group_order(group_by))
+
+
+def apply_view_changes(view_def, view_records, changes):
+    """
+    Применяет изменения исходной таблицы к содержимому представления.
+    changes — список пар (старая запись, новая запись):
+    вставка — (None, новая), удаление — (старая, None).
+    Возвращает новое содержимое представления.
+    """
+    matches = compile_where(view_def.get('where'))
+    group_by = view_def.get('group_by')
+
+    if not group_by:
+        by_id = {record['ID']: record for record in view_records}
+        for old, new in changes:
+            new_matches = new is not None and matches(new)
+            if old is not None and (
+                not new_matches or old['ID'] != new['ID']
+            ):
+                by_id.pop(old['ID'], None)
+            if new_matches:
+                by_id[new['ID']] = new
+        # Как и в исходной таблице, записи идут по возрастанию ID
+        return sorted(by_id.values(), key=lambda record: record['ID'])
+
+    groups = {record[group_by]: record for record in view_records}
+    for old, new in changes:
+        if old is not None and matches(old):
+            key = old.get(group_by)
+            if key in groups:
+                groups[key][COUNT_COLUMN] -= 1
+        if new is not None and matches(new):
+            key = new.get(group_by)
+            if key in groups:
+                groups[key][COUNT_COLUMN] += 1
+            else:
+                groups[key] = {group_by: key, COUNT_COLUMN: 1}
+    return sorted(
+        (record for record in groups.values() if record[COUNT_COLUMN] > 0),
+        key=_group_order(group_by),
+    )
@@ -0,0 +1,78 @@
+import os
+
+import pytest
+
+from src.primitive_db import backup, core
+from src.primitive_db.utils import load_table_data, save_metadata, save_table_data
+
+METADATA = {
+    'users': {'columns': ['ID:int', 'name:str', 'age:int'], 'codec': 'rows'},
+    'cities': {'columns': ['ID:int', 'title:str'], 'codec': 'rows'},
+}
+
+
+def _users(count):
+    return [{'ID': i, 'name': f'Пользователь {i}', 'age': 20 + i % 50}
+            for i in range(1, count + 1)]
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(backup, 'CHUNK_SIZE', 256)
+    save_metadata(METADATA)
+    save_table_data('users', _users(500), table_meta=METADATA['users'])
+    save_table_data('cities', [{'ID': 1, 'title': 'Москва'}],
+                    table_meta=METADATA['cities'])
+    return tmp_path
+
+
+def test_repeated_backup_copies_nothing(database):
+    first = backup.create_backup('backups')
+    assert first['copied_bytes'] == first['total_bytes']
+    assert set(first['tables']) == set(METADATA)
+
+    second = backup.create_backup('backups')
+    assert second['copied_bytes'] == 0
+    assert second['total_bytes'] == first['total_bytes']
+    assert backup.list_backups('backups') == [first['id'], second['id']]
+
+
+def test_backup_copies_only_changed_chunks(database):
+    backup.create_backup('backups')
+    save_table_data('users', _users(501), table_meta=METADATA['users'])
+
+    manifest = backup.create_backup('backups')
+    table_size = os.path.getsize(os.path.join('data', 'users.json'))
+    assert 0 < manifest['copied_bytes'] <= 2 * backup.CHUNK_SIZE
+    assert manifest['copied_bytes'] < table_size
+
+
+def test_restore_rewrites_only_changed_tables(database):
+    manifest = backup.create_backup('backups')
+    save_table_data('users', _users(3), table_meta=METADATA['users'])
+
+    restored_manifest, restored, unchanged = backup.restore_backup('backups')
+    assert restored_manifest['id'] == manifest['id']
+    assert restored == ['users']
+    assert unchanged == 1
+    assert load_table_data('users') == _users(500)
+
+    _, restored, unchanged = backup.restore_backup('backups')
+    assert restored == []
+    assert unchanged == 2
+
+
+def test_restore_command_asks_for_confirmation(database, monkeypatch):
+    backup.create_backup('backups')
+    save_table_data('users', _users(3), table_meta=METADATA['users'])
+
+    monkeypatch.setattr('builtins.input', lambda prompt: 'n')
+    ok, _ = core.restore('backups')
+    assert not ok
+    assert load_table_data('users') == _users(3)
+
+    monkeypatch.setattr('builtins.input', lambda prompt: 'y')
+    ok, _ = core.restore('backups')
+    assert ok
+    assert load_table_data('users') == _users(500)
@@ -0,0 +1,201 @@
+import copy
+import random
+
+import pytest
+
+from src.primitive_db import core, indexes
+from src.primitive_db.backup import create_backup
+from src.primitive_db.utils import save_metadata, select_rows
+
+NAMES = ['Иван', 'иванов', 'Ирина', 'Анна', 'андрей', 'Abc', 'abd', 'ABE']
+
+
+def _records(names):
+    return [{'ID': i, 'name': name} for i, name in enumerate(names, start=1)]
+
+
+def test_lookup_prefix_is_case_insensitive():
+    index = indexes.build_prefix_index(_records(NAMES), 'name')
+    assert index['keys'] == sorted(name.casefold() for name in NAMES)
+    assert sorted(indexes.lookup_prefix(index, 'ив')) == [1, 2]
+    assert sorted(indexes.lookup_prefix(index, 'AB')) == [6, 7, 8]
+    assert sorted(indexes.lookup_prefix(index, 'abc')) == [6]
+    assert indexes.lookup_prefix(index, 'я') == []
+    assert len(indexes.lookup_prefix(index, '')) == len(NAMES)
+
+
+def test_select_rows():
+    names = ['ID', 'name']
+    rows = [[1, 'a'], [3, 'b'], [4, 'c'], [9, 'd']]
+    assert select_rows(names, rows, [9, 3, 5]) == [[3, 'b'], [9, 'd']]
+    assert select_rows(names, rows, []) == []
+    # Порядок ID нарушен — строки находятся через словарь
+    shuffled = [rows[2], rows[0], rows[3], rows[1]]
+    assert select_rows(names, shuffled, [4, 1]) == [[1, 'a'], [4, 'c']]
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(indexes, '_loaded', {})
+    return str(tmp_path)
+
+
+def _random_changes(rng, records, count):
+    """
+    Изменяет записи случайными вставками, обновлениями и удалениями
+    и возвращает пары (старая запись, новая запись).
+    """
+    changes = []
+    for _ in range(count):
+        operation = rng.choice(['insert', 'update', 'update', 'delete'])
+        if operation == 'insert' or not records:
+            record = {'ID': max(records, default=0) + 1, 'name': rng.choice(NAMES)}
+            records[record['ID']] = record
+            changes.append((None, record))
+        elif operation == 'update':
+            old = records[rng.choice(list(records))]
+            new = dict(old, name=rng.choice(NAMES + [None]))
+            records[new['ID']] = new
+            changes.append((old, new))
+        else:
+            old = records.pop(rng.choice(list(records)))
+            changes.append((old, None))
+    return changes
+
+
+@pytest.mark.parametrize('batch', [1, 200])
+def test_update_index_matches_rebuild(data_dir, monkeypatch, batch):
+    monkeypatch.setattr(indexes, 'JOURNAL_MIN_ENTRIES', 150)
+    rng = random.Random(batch)
+    records = {record['ID']: record for record in _records(NAMES * 20)}
+    indexes.save_index('users', 'name', indexes.build_prefix_index(
+        records.values(), 'name'
+    ), data_dir)
+
+    for _ in range(600 // batch):
+        changes = _random_changes(rng, records, batch)
+        indexes.update_index('users', 'name', changes, data_dir)
+
+    expected = indexes.build_prefix_index(records.values(), 'name')
+    assert indexes.load_index('users', 'name', data_dir) == expected
+    # Без кэша индекс собирается из файла и журнала
+    indexes._loaded.clear()
+    assert indexes.load_index('users', 'name', data_dir) == expected
+
+
+def test_unrelated_changes_do_not_touch_index(data_dir, tmp_path):
+    records = _records(NAMES)
+    indexes.save_index(
+        'users', 'name', indexes.build_prefix_index(records, 'name'), data_dir
+    )
+    files = sorted(path.name for path in (tmp_path / 'indexes').iterdir())
+    index_file = tmp_path / 'indexes' / 'users.name.json'
+    stat = index_file.stat()
+
+    old = dict(records[0], age=1)
+    new = dict(records[0], age=2)
+    case_only = (records[5], dict(records[5], name='ABC'))
+    indexes.update_index('users', 'name', [(old, new), case_only], data_dir)
+
+    assert sorted(path.name for path in (tmp_path / 'indexes').iterdir()) == files
+    assert index_file.stat().st_mtime_ns == stat.st_mtime_ns
+
+
+def test_journal_is_appended_and_compacted(data_dir, tmp_path, monkeypatch):
+    monkeypatch.setattr(indexes, 'JOURNAL_MIN_ENTRIES', 3)
+    indexes.save_index('users', 'name', {'keys': [], 'ids': []}, data_dir)
+    journal = tmp_path / 'indexes' / 'users.name.log'
+
+    for record in _records(NAMES[:3]):
+        indexes.update_index('users', 'name', [(None, record)], data_dir)
+    assert len(journal.read_text(encoding='utf-8').split()) == 3
+
+    # Оборванная при сбое строка пропускается при чтении
+    with open(journal, 'a', encoding='utf-8') as file:
+        file.write('\n[["оборв')
+    indexes._loaded.clear()
+    assert sorted(indexes.load_index('users', 'name', data_dir)['ids']) == [1, 2, 3]
+
+    indexes.update_index('users', 'name', [(None, _records(NAMES)[3])], data_dir)
+    assert not journal.exists()
+    indexes._loaded.clear()
+    assert sorted(indexes.load_index('users', 'name', data_dir)['ids']) == [1, 2, 3, 4]
+
+
+QUERIES = [
+    {'name': {'like': 'Ив%'}},
+    {'name': {'ilike': 'ив%'}},
+    {'name': {'ilike': 'AN%'}},
+    {'name': {'like': 'a%'}},
+    {'name': {'like': '%'}},
+    {'name': {'like': 'И_ан%'}},
+    {'name': {'ilike': 'ив%'}, 'city': 'Омск'},
+    {'city': {'like': 'О%'}},
+]
+
+
+def _select(metadata, table_name, where_clause, **options):
+    core.cache_result.clear()
+    ok, result = core.select(metadata, table_name, where_clause, **options)
+    assert ok
+    if isinstance(result, str):
+        return result
+    if options:
+        return list(result)
+    return result.rows
+
+
+def _assert_index_matches_scan(metadata):
+    assert _select(metadata, 'users', {'name': {'like': '%'}}) != 'Таблица пуста.'
+    unindexed = copy.deepcopy(metadata)
+    del unindexed['users']['indexes']
+    for where_clause in QUERIES:
+        for options in [{}, {'order_by': 'name', 'limit': 5}]:
+            assert _select(metadata, 'users', where_clause, **options) == (
+                _select(unindexed, 'users', where_clause, **options)
+            ), where_clause
+
+
+def _random_writes(metadata, rng, count):
+    for _ in range(count):
+        operation = rng.choice(['insert', 'insert', 'update', 'update', 'delete'])
+        if operation == 'insert':
+            values = [rng.choice(NAMES), rng.choice(['Омск', 'Тула']),
+                      rng.randint(18, 60)]
+            core.insert(metadata, 'users', values)
+        elif operation == 'update':
+            set_clause = rng.choice([
+                {'name': rng.choice(NAMES)},
+                {'age': rng.randint(18, 60)},
+                {'city': rng.choice(['Омск', 'Тула'])},
+            ])
+            core.update(metadata, 'users', set_clause, {'name': rng.choice(NAMES)})
+        else:
+            core.delete(metadata, 'users', {'name': rng.choice(NAMES)})
+
+
+def test_indexed_select_matches_scan(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(indexes, '_loaded', {})
+    monkeypatch.setattr('builtins.input', lambda prompt: 'y')
+    rng = random.Random(31)
+
+    metadata = {}
+    core.create_table(metadata, 'users', ['name:str', 'city:str', 'age:int'])
+    # Индексируемый столбец хранится словарными кодами
+    metadata['users']['dictionary'] = ['name', 'city']
+    _random_writes(metadata, rng, 40)
+    ok, _ = core.create_index(metadata, 'users', 'name', 'prefix')
+    assert ok
+    _assert_index_matches_scan(metadata)
+
+    _random_writes(metadata, rng, 80)
+    _assert_index_matches_scan(metadata)
+
+    # После restore индекс строится заново по восстановленным данным
+    save_metadata(metadata)
+    create_backup('backups')
+    _random_writes(metadata, rng, 40)
+    ok, _ = core.restore('backups')
+    assert ok
+    _assert_index_matches_scan(metadata)
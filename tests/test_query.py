@@ -0,0 +1,73 @@
+import pytest
+
+from src.primitive_db.parser import parse_where_condition
+from src.primitive_db.query import compile_where, like_matcher, prefix_of
+
+
+@pytest.mark.parametrize('clause, expected', [
+    ('name = "Иван"', {'name': 'Иван'}),
+    ('age = 5', {'age': 5}),
+    ("name like 'Ив%'", {'name': {'like': 'Ив%'}}),
+    ("name ILIKE 'ив_н'", {'name': {'ilike': 'ив_н'}}),
+    ("name like '5'", {'name': {'like': '5'}}),
+])
+def test_parse_where_condition(clause, expected):
+    assert parse_where_condition(clause) == expected
+
+
+@pytest.mark.parametrize('clause', ['name', 'name ~ 5', "name like 'a' 'b'"])
+def test_parse_where_condition_rejects_bad_input(clause):
+    with pytest.raises(ValueError):
+        parse_where_condition(clause)
+
+
+@pytest.mark.parametrize('pattern, prefix', [
+    ('abc%', 'abc'),
+    ('%', ''),
+    ('a_c%', None),
+    ('a%c%', None),
+    ('abc', None),
+])
+def test_prefix_of(pattern, prefix):
+    assert prefix_of(pattern) == prefix
+
+
+@pytest.mark.parametrize('pattern, value, ignore_case, expected', [
+    ('Ив%', 'Иван', False, True),
+    ('ив%', 'Иван', False, False),
+    ('ив%', 'Иван', True, True),
+    ('%ан', 'Иван', False, True),
+    ('И_ан', 'Иван', False, True),
+    ('И_н', 'Иван', False, False),
+    ('%', '', False, True),
+    ('_', '', False, False),
+    ('a.c', 'abc', False, False),
+    ('a.c', 'a.c', False, True),
+    ('50%%', '50% скидка', False, True),
+    ('И%Н', 'иван', True, True),
+    ('Ив%', None, False, False),
+    ('1%', 10, False, False),
+])
+def test_like_matcher(pattern, value, ignore_case, expected):
+    assert like_matcher(pattern, ignore_case)(value) is expected
+
+
+def test_compile_where_on_dictionary_codes():
+    dictionaries = {'status': ['new', 'Active', 'archived']}
+    records = [
+        {'ID': 1, 'status': 0, 'age': 30},
+        {'ID': 2, 'status': 1, 'age': 30},
+        {'ID': 3, 'status': 2, 'age': 40},
+    ]
+
+    def ids(where_clause):
+        matches = compile_where(where_clause, dictionaries)
+        return [record['ID'] for record in records if matches(record)]
+
+    assert ids({'status': 'Active'}) == [2]
+    assert ids({'status': 'blocked'}) == []
+    assert ids({'status': {'like': 'a%'}}) == [3]
+    assert ids({'status': {'ilike': 'a%'}}) == [2, 3]
+    assert ids({'status': {'like': 'x%'}}) == []
+    assert ids({'status': {'ilike': 'a%'}, 'age': 30}) == [2]
+    assert ids(None) == [1, 2, 3]
@@ -0,0 +1,86 @@
+import random
+
+import pytest
+
+from src.primitive_db.results import (
+    SORT_BUFFER_ENV,
+    external_sort,
+    get_sort_buffer,
+    stream_table,
+    top_n,
+)
+
+
+def _key(row):
+    return (row[1] is not None, row[1])
+
+
+def _rows(count=50, seed=3):
+    rng = random.Random(seed)
+    values = [None, 1, 2, 3, 5, 8]
+    return [[i, rng.choice(values)] for i in range(count)]
+
+
+@pytest.mark.parametrize('buffer_size', [2, 3])
+@pytest.mark.parametrize('descending', [False, True])
+def test_external_sort_with_spills(buffer_size, descending):
+    rows = _rows()
+    result = external_sort(iter(rows), 1, descending, buffer_size)
+    try:
+        assert len(result._files) > 1
+        assert len(result) == len(rows)
+
+        expected = sorted(rows, key=_key, reverse=descending)
+        # Равные значения сохраняют исходный порядок
+        assert list(result) == expected
+        # Результат можно прочитать повторно
+        assert list(result) == expected
+    finally:
+        result.close()
+    assert result._files == []
+
+
+def test_none_sorts_first():
+    result = external_sort(iter(_rows()), 1, buffer_size=4)
+    values = [row[1] for row in result]
+    result.close()
+    count = values.count(None)
+    assert count and values[:count] == [None] * count
+
+
+def test_external_sort_in_memory():
+    result = external_sort(iter(_rows(5)), 1, buffer_size=10)
+    assert result._files == []
+    assert list(result) == sorted(_rows(5), key=_key)
+
+
+@pytest.mark.parametrize('descending', [False, True])
+def test_top_n_matches_full_sort(descending):
+    rows = _rows()
+    full = external_sort(iter(rows), 1, descending, buffer_size=3)
+    expected = list(full)[:7]
+    full.close()
+    assert top_n(iter(rows), 1, 7, descending) == expected
+
+
+def test_stream_table_closes_runs():
+    result = external_sort(iter(_rows()), 1, buffer_size=2)
+    files = list(result._files)
+    lines = list(stream_table(['ID', 'value'], result))
+
+    assert len(lines) == len(_rows()) + 4
+    assert len({len(line) for line in lines}) == 1
+    assert result._files == []
+    assert all(file.closed for file in files)
+
+
+def test_sort_buffer_from_environment(monkeypatch):
+    monkeypatch.setenv(SORT_BUFFER_ENV, '2')
+    assert get_sort_buffer() == 2
+    result = external_sort(iter(_rows(10)), 1)
+    assert len(result._files) == 5
+    result.close()
+
+    monkeypatch.setenv(SORT_BUFFER_ENV, '0')
+    with pytest.raises(ValueError):
+        get_sort_buffer()
@@ -0,0 +1,47 @@
+import pytest
+
+from src.primitive_db import core
+from src.primitive_db.schema import get_row_class, get_set_validator
+from src.primitive_db.utils import load_table_data, save_table_data
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_create_table_rejects_duplicate_columns(workdir):
+    metadata = {}
+    ok, _ = core.create_table(metadata, 'users', ['name:str', 'name:int'])
+    assert not ok
+    ok, _ = core.create_table(metadata, 'users', ['ID:int', 'name:str'])
+    assert not ok
+    assert metadata == {}
+
+
+def test_row_class_requires_unique_names():
+    table_meta = {'columns': ['ID:int', 'name:str', 'name:int']}
+    assert get_row_class('dup', table_meta) is None
+
+
+def test_set_validator_checks_types():
+    validate = get_set_validator({'columns': ['ID:int', 'name:str', 'age:int']})
+    assert validate({'name': 'Иван', 'age': 30})[0]
+    assert not validate({'age': 'тридцать'})[0]
+    assert not validate({'ID': 'один'})[0]
+
+
+def test_update_rejects_wrong_type_for_dict_rows(workdir):
+    # Имя столбца "1st" не подходит для атрибута, поэтому записи — словари
+    metadata = {'legacy': {'columns': ['ID:int', '1st:int'], 'codec': 'rows'}}
+    save_table_data('legacy', [{'ID': 1, '1st': 5}],
+                    table_meta=metadata['legacy'])
+
+    ok, _ = core.update(metadata, 'legacy', {'1st': 'пять'}, None)
+    assert not ok
+    assert load_table_data('legacy') == [{'ID': 1, '1st': 5}]
+
+    ok, _ = core.update(metadata, 'legacy', {'1st': 7}, None)
+    assert ok
+    assert load_table_data('legacy') == [{'ID': 1, '1st': 7}]
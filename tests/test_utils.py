@@ -0,0 +1,124 @@
+import json
+
+import pytest
+
+from src.primitive_db import utils
+from src.primitive_db.query import compile_where
+from src.primitive_db.utils import (
+    BINARY_MAGIC,
+    CONTAINER_MAGIC,
+    encode_table_data,
+    load_encoded_table_data,
+    load_table_data,
+    save_table_data,
+    unpack_table_data,
+)
+
+BINARY_META = {
+    'columns': ['ID:int', 'name:str', 'balance:int', 'is_active:bool'],
+    'codec': 'binary',
+}
+
+RECORDS = [
+    {'ID': 1, 'name': 'Иван', 'balance': -42, 'is_active': True},
+    {'ID': 2, 'name': 'Ёжик в тумане', 'balance': -2**63, 'is_active': False},
+    {'ID': 3, 'name': '', 'balance': 2**63 - 1, 'is_active': True},
+]
+
+
+def test_binary_round_trip(tmp_path):
+    save_table_data('users', RECORDS, tmp_path, BINARY_META)
+    assert (tmp_path / 'users.json').read_bytes().startswith(BINARY_MAGIC)
+    assert load_table_data('users', tmp_path) == RECORDS
+    assert load_table_data('users', tmp_path, BINARY_META) == RECORDS
+
+
+def test_binary_empty_table(tmp_path):
+    save_table_data('users', [], tmp_path, BINARY_META)
+    assert load_table_data('users', tmp_path, BINARY_META) == []
+
+
+def test_binary_int_overflow():
+    record = {'ID': 1, 'name': 'Иван', 'balance': 2**63, 'is_active': True}
+    with pytest.raises(ValueError):
+        encode_table_data([record], BINARY_META)
+
+
+@pytest.mark.parametrize('column, value', [
+    ('is_active', 1),
+    ('is_active', 'да'),
+    ('balance', '42'),
+    ('name', None),
+])
+def test_binary_rejects_wrong_types(column, value):
+    record = dict(RECORDS[0], **{column: value})
+    with pytest.raises(ValueError):
+        encode_table_data([record], BINARY_META)
+
+
+def test_binary_rejects_missing_column(tmp_path):
+    # В старом файле нет столбца is_active — при чтении он становится None
+    legacy = [{key: value for key, value in record.items() if key != 'is_active'}
+              for record in RECORDS]
+    (tmp_path / 'users.json').write_text(json.dumps(legacy), encoding='utf-8')
+    records = load_table_data('users', tmp_path, BINARY_META)
+    with pytest.raises(ValueError):
+        save_table_data('users', records, tmp_path, BINARY_META)
+
+
+def test_legacy_json_is_read_transparently(tmp_path):
+    (tmp_path / 'users.json').write_text(
+        json.dumps(RECORDS, indent=4, ensure_ascii=False), encoding='utf-8'
+    )
+    assert load_table_data('users', tmp_path) == RECORDS
+    assert load_table_data('users', tmp_path, BINARY_META) == RECORDS
+
+
+@pytest.mark.parametrize('codec', ['rows', 'binary'])
+@pytest.mark.parametrize('compression', ['zlib', 'lzma'])
+def test_container_round_trip(tmp_path, codec, compression):
+    table_meta = {
+        'columns': ['ID:int', 'name:str', 'status:str'],
+        'codec': codec,
+        'dictionary': ['status'],
+        'compression': compression,
+    }
+    statuses = ['new', 'активен', 'blocked']
+    records = [
+        {'ID': i, 'name': f'Пользователь {i}', 'status': statuses[i % 3]}
+        for i in range(1, 101)
+    ]
+    save_table_data('users', records, tmp_path, table_meta)
+
+    raw = (tmp_path / 'users.json').read_bytes()
+    assert raw.startswith(CONTAINER_MAGIC)
+    assert load_table_data('users', tmp_path, table_meta) == records
+
+    # Словарные столбцы читаются как целочисленные коды
+    encoded, dictionaries = unpack_table_data(raw)
+    assert set(dictionaries) == {'status'}
+    assert all(isinstance(record['status'], int) for record in encoded)
+    assert [dictionaries['status'][record['status']] for record in encoded] == [
+        record['status'] for record in records
+    ]
+
+    encoded, dictionaries = load_encoded_table_data('users', tmp_path, table_meta)
+    matches = compile_where({'status': 'активен'}, dictionaries)
+    assert [record['ID'] for record in encoded if matches(record)] == [
+        record['ID'] for record in records if record['status'] == 'активен'
+    ]
+
+
+def test_write_file_atomic_keeps_original_error(tmp_path, monkeypatch):
+    def failing_open(*args, **kwargs):
+        raise OSError('нет места на диске')
+
+    monkeypatch.setattr(utils, 'open', failing_open, raising=False)
+    with pytest.raises(OSError, match='нет места на диске'):
+        utils.write_file_atomic(str(tmp_path / 'users.json'), b'[]')
+
+
+def test_write_file_atomic_removes_temp_file(tmp_path):
+    with pytest.raises(TypeError):
+        utils.write_file_atomic(str(tmp_path / 'users.json'), 'не байты')
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,82 @@
+import random
+
+import pytest
+
+from src.primitive_db import core
+from src.primitive_db.utils import load_table_data
+
+CITIES = ['Москва', 'Казань', 'Омск']
+NAMES = ['Иван', 'Мария', 'Петр']
+
+VIEWS = {
+    'all_users': {},
+    'moscow': {'where_clause': {'city': 'Москва'}},
+    'by_city': {'group_by': 'city'},
+    'moscow_by_name': {'where_clause': {'city': 'Москва'}, 'group_by': 'name'},
+}
+
+
+@pytest.fixture
+def metadata(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr('builtins.input', lambda prompt: 'y')
+    metadata = {}
+    ok, _ = core.create_table(metadata, 'users', ['name:str', 'city:str', 'age:int'])
+    assert ok
+    for view_name, query in VIEWS.items():
+        ok, _ = core.create_view(metadata, view_name, 'users', **query)
+        assert ok
+    return metadata
+
+
+def _contents(metadata, view_name):
+    records = load_table_data(view_name, table_meta=metadata[view_name])
+    return [dict(record.items()) for record in records]
+
+
+def _assert_views_match_refresh(metadata):
+    for view_name in VIEWS:
+        incremental = _contents(metadata, view_name)
+        ok, _ = core.refresh_view(metadata, view_name)
+        assert ok
+        assert incremental == _contents(metadata, view_name), view_name
+
+
+def test_views_follow_inserts_updates_and_deletes(metadata):
+    rng = random.Random(7)
+    for _ in range(60):
+        operation = rng.choice(['insert', 'insert', 'update', 'delete'])
+        if operation == 'insert':
+            values = [rng.choice(NAMES), rng.choice(CITIES), rng.randint(18, 60)]
+            core.insert(metadata, 'users', values)
+        elif operation == 'update':
+            set_clause = rng.choice([
+                {'city': rng.choice(CITIES)},
+                {'name': rng.choice(NAMES)},
+                {'age': rng.randint(18, 60)},
+            ])
+            where_clause = rng.choice([None, {'name': rng.choice(NAMES)}])
+            core.update(metadata, 'users', set_clause, where_clause)
+        else:
+            core.delete(metadata, 'users', {'city': rng.choice(CITIES)})
+    assert load_table_data('users')
+    _assert_views_match_refresh(metadata)
+
+
+def test_group_disappears_when_emptied(metadata):
+    core.insert(metadata, 'users', ['Иван', 'Омск', 30])
+    core.insert(metadata, 'users', ['Мария', 'Москва', 25])
+    core.delete(metadata, 'users', {'city': 'Омск'})
+    assert _contents(metadata, 'by_city') == [{'city': 'Москва', 'count': 1}]
+    _assert_views_match_refresh(metadata)
+
+
+def test_view_keeps_id_order_after_update(metadata):
+    core.insert(metadata, 'users', ['Иван', 'Омск', 30])
+    core.insert(metadata, 'users', ['Мария', 'Москва', 25])
+    core.update(metadata, 'users', {'city': 'Москва'}, {'name': 'Иван'})
+    assert [record['ID'] for record in _contents(metadata, 'moscow')] == [1, 2]
+    assert [record['city'] for record in _contents(metadata, 'by_city')] == [
+        'Москва'
+    ]
+    _assert_views_match_refresh(metadata)